@@ -627,17 +627,14 @@ def _apply_platform_workarounds() -> None:
             )
 
 
+_EXCLUDE_SEPARATOR_RE = re.compile(r"\s*,\s*")
+
+
 def _parse_exclude_text(text: str) -> tuple[str, ...]:
     if not text:
         return tuple()
-    parsed: list[str] = []
-    for item in text.split(","):
-        normalized = item.strip()
-        if not normalized:
-            continue
-        if normalized not in parsed:
-            parsed.append(normalized)
-    return tuple(parsed)
+    tokens = _EXCLUDE_SEPARATOR_RE.split(text.strip())
+    return tuple(dict.fromkeys(token for token in tokens if token))
 
 
 class CandidateDialog(_QDialogBase):
@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import ast
+import contextlib
+import functools
 import json
 import os
+import secrets
+import stat
 import sys
 from dataclasses import dataclass, field
 from importlib import import_module
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Mapping, MutableMapping, Protocol, cast
 
 from .patcher import DEFAULT_EXCLUDE_DIRS
@@ -20,7 +25,10 @@ class _TomllibModule(Protocol):
         ...
 
 
+@functools.lru_cache(maxsize=1)
 def _import_tomllib() -> _TomllibModule | None:
+    """Import ``tomllib``/``tomli`` the first time a config file is parsed."""
+
     for name in ("tomllib", "tomli"):
         try:
             module = import_module(name)
@@ -30,10 +38,20 @@ def _import_tomllib() -> _TomllibModule | None:
     return None
 
 
-_tomllib: _TomllibModule | None = _import_tomllib()
-
-
 _CONFIG_SECTION = "patch_gui"
+_CONFIG_TEMPLATE = (
+    "[{section}]\n"
+    "threshold = {threshold}\n"
+    "exclude_dirs = [{exclude_dirs}]\n"
+    "backup_base = {backup_base}\n"
+    "log_level = {log_level}\n"
+    "dry_run_default = {dry_run_default}\n"
+    "write_reports = {write_reports}\n"
+    "log_file = {log_file}\n"
+    "log_max_bytes = {log_max_bytes}\n"
+    "log_backup_count = {log_backup_count}\n"
+    "backup_retention_days = {backup_retention_days}\n"
+)
 _CONFIG_FILENAME = "settings.toml"
 _DEFAULT_THRESHOLD = 0.85
 _DEFAULT_LOG_LEVEL = "warning"
@@ -43,6 +61,8 @@ _DEFAULT_LOG_FILE_NAME = ".patch_gui.log"
 _DEFAULT_LOG_MAX_BYTES = 0
 _DEFAULT_LOG_BACKUP_COUNT = 0
 _DEFAULT_BACKUP_RETENTION_DAYS = 0
+_TRUE_STRINGS = frozenset({"true", "1", "yes", "on"})
+_FALSE_STRINGS = frozenset({"false", "0", "no", "off"})
 
 
 def _default_log_file() -> Path:
@@ -68,7 +88,7 @@ __all__ = [
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     """Dataclass representing the persisted configuration values."""
 
@@ -163,17 +183,39 @@ def default_config_path() -> Path:
 
 
 def load_config(path: Path | None = None) -> AppConfig:
-    """Load the configuration from ``path`` or the default location."""
+    """Load the configuration from ``path`` or the default location.
+
+    Parsed files are cached by inode, size and timestamps, so a same-size
+    in-place edit within the timestamp granularity may go unnoticed.
+    """
 
     target = Path(path) if path is not None else default_config_path()
-    if not target.exists():
-        return AppConfig()
     try:
-        raw_data = target.read_bytes()
+        stat_result = target.stat()
+        data = _load_config_file(
+            str(target),
+            stat_result.st_ino,
+            stat_result.st_size,
+            stat_result.st_mtime_ns,
+            stat_result.st_ctime_ns,
+        )
     except OSError:
         return AppConfig()
+    return AppConfig.from_mapping(data)
 
-    parsed = _load_toml(raw_data)
+
+def _clear_config_cache() -> None:
+    """Forget previously parsed configuration files."""
+
+    _load_config_file.cache_clear()
+
+
+@functools.lru_cache(maxsize=32)
+def _load_config_file(
+    path: str, inode: int, size: int, mtime_ns: int, ctime_ns: int
+) -> Mapping[str, Any]:
+    del inode, size, mtime_ns, ctime_ns  # only part of the cache key
+    parsed = _load_toml(Path(path).read_bytes())
     section = parsed.get(_CONFIG_SECTION)
     if isinstance(section, Mapping):
         data = section
@@ -181,9 +223,10 @@ def load_config(path: Path | None = None) -> AppConfig:
         data = parsed if isinstance(parsed, Mapping) else {}
 
     if not isinstance(data, Mapping):
-        return AppConfig()
+        return MappingProxyType({})
 
-    return AppConfig.from_mapping(data)
+    # Read-only view: the same mapping is handed to every later load.
+    return MappingProxyType(dict(data))
 
 
 def save_config(config: AppConfig, path: Path | None = None) -> Path:
@@ -193,44 +236,86 @@ def save_config(config: AppConfig, path: Path | None = None) -> Path:
     target.parent.mkdir(parents=True, exist_ok=True)
 
     mapping = config.to_mapping()
-    threshold_repr = _format_float(mapping["threshold"])
-    exclude_repr = ", ".join(json.dumps(item) for item in mapping["exclude_dirs"])
-    log_level_repr = json.dumps(mapping["log_level"])
-    dry_run_repr = json.dumps(mapping["dry_run_default"])
-    write_reports_repr = json.dumps(mapping["write_reports"])
-    backup_repr = json.dumps(mapping["backup_base"])
-    log_file_repr = json.dumps(mapping["log_file"])
-    log_max_bytes_repr = json.dumps(mapping["log_max_bytes"])
-    log_backup_count_repr = json.dumps(mapping["log_backup_count"])
-    backup_retention_repr = json.dumps(mapping["backup_retention_days"])
-
-    content_lines = [
-        f"[{_CONFIG_SECTION}]",
-        f"threshold = {threshold_repr}",
-        f"exclude_dirs = [{exclude_repr}]",
-        f"backup_base = {backup_repr}",
-        f"log_level = {log_level_repr}",
-        f"dry_run_default = {dry_run_repr}",
-        f"write_reports = {write_reports_repr}",
-        f"log_file = {log_file_repr}",
-        f"log_max_bytes = {log_max_bytes_repr}",
-        f"log_backup_count = {log_backup_count_repr}",
-        f"backup_retention_days = {backup_retention_repr}",
-        "",
-    ]
-
-    target.write_text("\n".join(content_lines), encoding="utf-8")
+    content = _CONFIG_TEMPLATE.format(
+        section=_CONFIG_SECTION,
+        threshold=_format_float(mapping["threshold"]),
+        exclude_dirs=", ".join(json.dumps(item) for item in mapping["exclude_dirs"]),
+        backup_base=json.dumps(mapping["backup_base"]),
+        log_level=json.dumps(mapping["log_level"]),
+        dry_run_default=_format_bool(mapping["dry_run_default"]),
+        write_reports=_format_bool(mapping["write_reports"]),
+        log_file=json.dumps(mapping["log_file"]),
+        log_max_bytes=mapping["log_max_bytes"],
+        log_backup_count=mapping["log_backup_count"],
+        backup_retention_days=mapping["backup_retention_days"],
+    )
+
+    _write_atomic(target, content.encode("utf-8"))
+    # A rewrite within the filesystem's timestamp granularity may keep the same
+    # mtime and size, so do not rely on the cache key to notice it.
+    _clear_config_cache()
     return target
 
 
+def _write_atomic(target: Path, data: bytes) -> None:
+    """Replace ``target`` with ``data`` so readers never see a partial file.
+
+    Symlinks are written through rather than replaced, and the file keeps its
+    permission bits (or gets the umask default when it is created).
+    """
+
+    target = target.resolve()
+    mode = _existing_file_mode(target)
+    fd, temp_name = _create_temp_file(target)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if mode is not None:
+            os.chmod(temp_name, mode)
+        os.replace(temp_name, target)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_name)
+        raise
+
+
+def _create_temp_file(target: Path) -> tuple[int, str]:
+    # Unlike ``tempfile.mkstemp`` (always 0600), ``os.open`` lets the kernel
+    # apply the process umask to the requested 0666 mode.
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+    while True:
+        temp_name = str(target.parent / f".{target.name}.{secrets.token_hex(8)}.tmp")
+        try:
+            return os.open(temp_name, flags, 0o666), temp_name
+        except FileExistsError:
+            continue
+
+
+def _existing_file_mode(target: Path) -> int | None:
+    try:
+        return stat.S_IMODE(target.stat().st_mode)
+    except FileNotFoundError:
+        return None
+
+
 def _format_float(value: float) -> str:
     return format(value, ".6g")
 
 
+def _format_bool(value: bool) -> str:
+    return "true" if value else "false"
+
+
 def _load_toml(data: bytes) -> MutableMapping[str, Any]:
-    if _tomllib is not None:  # pragma: no cover - exercised in Python 3.11+
+    tomllib = _import_tomllib()
+    if tomllib is not None:  # pragma: no cover - exercised in Python 3.11+
         try:
-            parsed = _tomllib.loads(data.decode("utf-8"))
+            parsed = tomllib.loads(data.decode("utf-8"))
         except Exception:
             return {}
         if isinstance(parsed, MutableMapping):
@@ -336,9 +421,9 @@ def _coerce_bool(value: Any, default: bool) -> bool:
         return bool(value)
     if isinstance(value, str):
         normalized = value.strip().lower()
-        if normalized in {"true", "1", "yes", "on"}:
+        if normalized in _TRUE_STRINGS:
             return True
-        if normalized in {"false", "0", "no", "off"}:
+        if normalized in _FALSE_STRINGS:
             return False
     return default
 
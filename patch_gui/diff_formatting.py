@@ -21,8 +21,7 @@ def format_diff_with_line_numbers(patched_file: PatchedFile, fallback_text: str)
 
         patch_info = getattr(patched_file, "patch_info", "")
         if patch_info:
-            for info_line in str(patch_info).splitlines():
-                lines.append(info_line)
+            lines.extend(str(patch_info).splitlines())
 
         source_file = getattr(patched_file, "source_file", None) or "-"
         target_file = getattr(patched_file, "target_file", None) or "-"
@@ -31,8 +30,7 @@ def format_diff_with_line_numbers(patched_file: PatchedFile, fallback_text: str)
 
         for hunk in patched_file:
             lines.append(_format_hunk_header(hunk))
-            for diff_line in hunk:
-                lines.append(_format_numbered_line(diff_line))
+            lines.extend(map(_format_numbered_line, hunk))
 
         return "\n".join(lines) + "\n"
     except Exception:  # pragma: no cover - defensive, falls back to raw diff text
@@ -58,12 +56,15 @@ def _format_hunk_range(start: int, length: int) -> str:
 def _format_numbered_line(line: UnidiffLine) -> str:
     left = _format_line_number(line.source_line_no)
     right = _format_line_number(line.target_line_no)
-    content = str(line).rstrip("\n")
-    return f"{left} │ {right} │ {content}"
+    content = line.value.rstrip("\n")
+    return f"{left} │ {right} │ {line.line_type}{content}"
+
+
+_BLANK_LINE_NUMBER = " " * 6
 
 
 def _format_line_number(value: int | None) -> str:
-    return f"{value:>6}" if value is not None else " " * 6
+    return f"{value:>6}" if value is not None else _BLANK_LINE_NUMBER
 
 
 def format_diff_side_by_side(
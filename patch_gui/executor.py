@@ -45,6 +45,7 @@ logger = logging.getLogger(__name__)
 __all__ = [
     "CLIError",
     "ApplySession",
+    "FALLBACK_LOG_EVENT",
     "apply_patchset",
     "load_patch",
     "session_completed",
@@ -52,6 +53,10 @@ __all__ = [
 ]
 
 
+# ``event`` attribute attached to log records emitted for lossy decodes.
+FALLBACK_LOG_EVENT = "decoding_fallback"
+
+
 class CLIError(Exception):
     """Raised for recoverable CLI usage errors."""
 
@@ -70,6 +75,7 @@ def load_patch(source: str, encoding: str | None = None) -> PatchSet:
                 ),
                 source_label,
                 detected_encoding,
+                extra={"event": FALLBACK_LOG_EVENT},
             )
 
     if source == "-":
@@ -87,10 +93,12 @@ def load_patch(source: str, encoding: str | None = None) -> PatchSet:
                         "Cannot decode diff from STDIN using encoding {encoding}: {error}"
                     ).format(encoding=encoding, error=exc)
                 ) from exc
+            del data
         else:
             if stream is not None:
                 raw = stream.read()
                 text, detected_encoding, used_fallback = decode_bytes(raw)
+                del raw
                 _log_decoding_details("STDIN", detected_encoding, used_fallback)
             else:
                 text = sys.stdin.read()
@@ -124,9 +132,14 @@ def load_patch(source: str, encoding: str | None = None) -> PatchSet:
                     _("Cannot read {path}: {error}").format(path=path, error=exc)
                 ) from exc
             text, detected_encoding, used_fallback = decode_bytes(raw)
+            del raw
             _log_decoding_details(str(path), detected_encoding, used_fallback)
 
+    # Only the normalized text is needed past this point: releasing the raw
+    # bytes and the original text keeps large diffs from being held in memory
+    # several times over while unidiff builds its own line objects.
     processed = preprocess_patch_text(text)
+    del text
     try:
         patch = PatchSet(processed)
     except UnidiffParseError as exc:
@@ -553,6 +566,7 @@ def _apply_file_patch(
                 ),
                 path,
                 file_encoding,
+                extra={"event": FALLBACK_LOG_EVENT},
             )
         orig_eol = "\r\n" if "\r\n" in content else "\n"
         lines = normalize_newlines(content).splitlines(keepends=True)
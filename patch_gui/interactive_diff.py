@@ -1178,15 +1178,11 @@ def _format_badges(entry: FileDiffEntry, colors: _DiffPalette) -> str:
 
 
 def _count_changes(diff_text: str) -> tuple[int, int]:
-    additions = 0
-    deletions = 0
-    for line in diff_text.splitlines():
-        if line.startswith("+++") or line.startswith("---"):
-            continue
-        if line.startswith("+"):
-            additions += 1
-        elif line.startswith("-"):
-            deletions += 1
+    # Prefix a newline so the first line is matched like every other one;
+    # ``+++``/``---`` file headers are counted by the shorter patterns too.
+    text = "\n" + diff_text
+    additions = text.count("\n+") - text.count("\n+++")
+    deletions = text.count("\n-") - text.count("\n---")
     return additions, deletions
 
 
@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+import os
 import sys
 import types
 from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from tests._pytest_typing import typed_fixture
 
 PACKAGE_NAME = "patch_gui"
 
@@ -12,3 +18,56 @@ if PACKAGE_NAME not in sys.modules:
     package = types.ModuleType(PACKAGE_NAME)
     package.__path__ = [str(Path(__file__).resolve().parents[1] / PACKAGE_NAME)]
     sys.modules[PACKAGE_NAME] = package
+
+
+@typed_fixture(scope="session", autouse=True)
+def _deterministic_cli_locale() -> Iterator[None]:
+    """Run the suite with the default CLI language and a fresh translation cache."""
+
+    from patch_gui import localization
+
+    with pytest.MonkeyPatch.context() as session_monkeypatch:
+        session_monkeypatch.delenv(localization.LANG_ENV_VAR, raising=False)
+        localization.clear_translation_cache()
+        yield
+
+
+@typed_fixture(scope="session")
+def qt_app() -> Any:
+    """Provide the shared ``QApplication``, importing PySide6 only on first use."""
+
+    QtWidgets = pytest.importorskip(
+        "PySide6.QtWidgets", reason="PySide6 non disponibile"
+    )
+
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        # Each xdist worker is its own process and needs its own application;
+        # keep its start-up cheap by not touching the window system.
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QtWidgets.QApplication(sys.argv[:1])
+    return app
+
+
+@typed_fixture()
+def make_widget(
+    qt_app: Any, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[Callable[..., Any]]:
+    """Build widgets on the shared application and dispose of them after the test."""
+
+    # Depending on ``monkeypatch`` makes the widgets close before the test's
+    # patches are undone; ``MainWindow.closeEvent`` persists the configuration
+    # and must not reach the real settings file.
+    created: list[Any] = []
+
+    def factory(widget_cls: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        widget = widget_cls(*args, **kwargs)
+        created.append(widget)
+        return widget
+
+    yield factory
+
+    for widget in reversed(created):
+        widget.close()
+        widget.deleteLater()
+    qt_app.processEvents()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import argparse
+import dataclasses
+import functools
 import io
 import os
 import json
@@ -10,20 +12,22 @@ import sys
 import time
 import types
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional
 
 import pytest
 from unidiff import PatchSet
+from unidiff.errors import UnidiffParseError
 
-from tests._pytest_typing import typed_parametrize
+from tests._pytest_typing import typed_fixture, typed_parametrize
 
 import patch_gui
-from patch_gui import cli, localization
+from patch_gui import cli
 from patch_gui.config import AppConfig, load_config, save_config
 from patch_gui.downloader import DownloadError
 import patch_gui.executor as executor
 import patch_gui.utils as utils
 import patch_gui.parser as parser
+import patch_gui.reporting as reporting
 from patch_gui.utils import (
     BACKUP_DIR,
     REPORT_JSON,
@@ -39,6 +43,10 @@ SAMPLE_DIFF = """--- a/sample.txt
  line2
 """
 
+_SAMPLE_DIFF_BYTES = SAMPLE_DIFF.encode("utf-8")
+_OLD_LINE = b"old line\n"
+_SAMPLE_CONTENT = _OLD_LINE + b"line2\n"
+
 AMBIGUOUS_DIFF = """--- a/app/sample.txt
 +++ b/app/sample.txt
 @@ -1 +1 @@
@@ -46,6 +54,9 @@ AMBIGUOUS_DIFF = """--- a/app/sample.txt
 +new line
 """
 
+_EXPECTED_AMBIGUOUS = ("src/app/sample.txt", "tests/app/sample.txt")
+_EXPECTED_DUPLICATE_CANDIDATES = ("docs/sample.txt", "legacy/sample.txt")
+
 FUZZY_MANUAL_DIFF = """--- a/sample.txt
 +++ b/sample.txt
 @@ -1,2 +1,2 @@
@@ -72,6 +83,8 @@ NON_UTF8_DIFF = """--- a/sample.txt
  line2
 """
 
+NON_UTF8_DIFF_UTF16 = NON_UTF8_DIFF.encode("utf-16")
+
 ADDED_DIFF = """--- /dev/null
 +++ b/docs/newfile.txt
 @@ -0,0 +1,2 @@
@@ -143,11 +156,220 @@ rename to docs/renamed.txt
 """
 
 
+@functools.lru_cache(maxsize=None)
+def _parsed_patch(diff_text: str) -> PatchSet:
+    """Parse ``diff_text`` once; ``apply_patchset`` never mutates the patch."""
+
+    return PatchSet(diff_text)
+
+
+def _make_tree(root: Path, spec: dict[str, bytes]) -> Path:
+    """Write ``spec`` (relative path -> content) under ``root``."""
+
+    created: set[Path] = set()
+    for relative, data in spec.items():
+        path = root / relative
+        if path.parent not in created:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            created.add(path.parent)
+        path.write_bytes(data)
+    return root
+
+
 def _create_project(tmp_path: Path) -> Path:
-    project = tmp_path / "project"
-    project.mkdir()
-    (project / "sample.txt").write_text("old line\nline2\n", encoding="utf-8")
-    return project
+    return _make_tree(tmp_path / "project", {"sample.txt": _SAMPLE_CONTENT})
+
+
+def _clone_project(source: Path, destination: Path) -> Path:
+    """Hardlink the files of ``source`` into ``destination`` without copying data."""
+
+    destination.mkdir()
+    for entry in sorted(source.rglob("*")):
+        target = destination / entry.relative_to(source)
+        if entry.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.link(entry, target)
+    return destination
+
+
+@typed_fixture(scope="session")
+def pristine_project(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _create_project(tmp_path_factory.mktemp("template"))
+
+
+@typed_fixture(scope="session")
+def ambiguous_project(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Read-only project where ``app/sample.txt`` matches two candidates."""
+
+    return _make_tree(
+        tmp_path_factory.mktemp("ambiguous"),
+        {"src/app/sample.txt": _OLD_LINE, "tests/app/sample.txt": _OLD_LINE},
+    )
+
+
+@typed_fixture(scope="session")
+def duplicate_project(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Read-only project where ``sample.txt`` exists only in two sibling dirs."""
+
+    return _make_tree(
+        tmp_path_factory.mktemp("duplicate"),
+        {"docs/sample.txt": _SAMPLE_CONTENT, "legacy/sample.txt": _SAMPLE_CONTENT},
+    )
+
+
+@typed_fixture(scope="session")
+def sample_diff_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """``SAMPLE_DIFF`` written once; ``load_patch`` only ever reads it."""
+
+    path = tmp_path_factory.mktemp("diffs") / "sample.diff"
+    path.write_bytes(_SAMPLE_DIFF_BYTES)
+    return path
+
+
+@typed_fixture(scope="session")
+def utf16_diff_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("diffs") / "non-utf8.diff"
+    path.write_bytes(NON_UTF8_DIFF_UTF16)
+    return path
+
+
+@typed_fixture()
+def project_ro(pristine_project: Path) -> Path:
+    """Shared template project for tests that neither modify nor add files."""
+
+    return pristine_project
+
+
+@typed_fixture()
+def project_rw(pristine_project: Path, tmp_path: Path) -> Path:
+    """Private copy of the template project for tests that modify files.
+
+    The files are copied rather than hardlinked because the executor rewrites
+    targets in place, which would leak changes back into the shared template.
+    """
+
+    return Path(
+        shutil.copytree(
+            pristine_project, tmp_path / "project", copy_function=shutil.copyfile
+        )
+    )
+
+
+@typed_fixture()
+def linked_project(pristine_project: Path, tmp_path: Path) -> Path:
+    """Per-test project sharing inodes with the template; only for dry runs."""
+
+    return _clone_project(pristine_project, tmp_path / "project")
+
+
+@typed_fixture()
+def memfs(monkeypatch: pytest.MonkeyPatch) -> dict[Path, str]:
+    """Redirect session report files to an in-memory mapping keyed by path."""
+
+    files: dict[Path, str] = {}
+
+    def fake_write_reports(
+        session: executor.ApplySession,
+        *,
+        json_path: Path | None = None,
+        txt_path: Path | None = None,
+        write_json: bool = True,
+        write_txt: bool = True,
+    ) -> tuple[Path | None, Path | None]:
+        report_dir = utils.default_session_report_dir(session.started_at)
+        json_target = (json_path or report_dir / REPORT_JSON) if write_json else None
+        txt_target = (txt_path or report_dir / REPORT_TXT) if write_txt else None
+        if json_target is not None:
+            files[json_target] = json.dumps(session.to_json(), ensure_ascii=False)
+        if txt_target is not None:
+            files[txt_target] = session.to_txt()
+        return json_target, txt_target
+
+    monkeypatch.setattr(reporting, "write_reports", fake_write_reports)
+    return files
+
+
+def _record_sessions(monkeypatch: pytest.MonkeyPatch) -> list[executor.ApplySession]:
+    """Capture the sessions created by ``run_cli`` without changing its behaviour."""
+
+    sessions: list[executor.ApplySession] = []
+    real_apply_patchset = cli.apply_patchset
+
+    def recording_apply_patchset(*args: Any, **kwargs: Any) -> executor.ApplySession:
+        session = real_apply_patchset(*args, **kwargs)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(cli, "apply_patchset", recording_apply_patchset)
+    return sessions
+
+
+@typed_fixture()
+def stdin_feeder(monkeypatch: pytest.MonkeyPatch) -> Callable[..., None]:
+    """Return a callable that queues one line per response for ``input()``."""
+
+    def feed(*responses: str) -> None:
+        buffer = io.StringIO("".join(f"{response}\n" for response in responses))
+        monkeypatch.setattr(sys, "stdin", buffer)
+
+    return feed
+
+
+def _log_events(caplog: pytest.LogCaptureFixture) -> set[str]:
+    return {getattr(record, "event", "") for record in caplog.records}
+
+
+def _force_decoding_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make the executor report every decoded payload as a UTF-8 fallback."""
+
+    real_decode = utils.decode_bytes
+
+    def fake_decode(data: bytes) -> tuple[str, str, bool]:
+        text, encoding, _ = real_decode(data)
+        return text, encoding, True
+
+    monkeypatch.setattr(executor, "decode_bytes", fake_decode)
+
+
+def _raise_on_parser_exit(
+    self: argparse.ArgumentParser, status: int = 0, message: str | None = None
+) -> None:
+    raise cli.CLIError(message.strip() if message else "parser exited")
+
+
+@typed_fixture()
+def argparse_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Turn argparse exits into ``CLIError`` so the message can be asserted."""
+
+    monkeypatch.setattr(
+        argparse.ArgumentParser, "exit", _raise_on_parser_exit, raising=False
+    )
+
+
+@typed_fixture(scope="module")
+def built_parser() -> argparse.ArgumentParser:
+    """Default CLI parser shared by tests that only read or format it."""
+
+    return parser.build_parser()
+
+
+@typed_fixture()
+def preserve_root_logger() -> Iterator[logging.Logger]:
+    """Restore the root logger handlers and level that ``run_cli`` reconfigures."""
+
+    root_logger = logging.getLogger()
+    saved_handlers = root_logger.handlers[:]
+    saved_level = root_logger.level
+    yield root_logger
+    root_logger.handlers[:] = saved_handlers
+    root_logger.setLevel(saved_level)
+
+
+@typed_fixture(autouse=True)
+def _warning_level(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.WARNING)
 
 
 def test_default_reports_dir_points_to_user_space() -> None:
@@ -159,12 +381,10 @@ def test_default_reports_dir_points_to_user_space() -> None:
     assert default_dir.parent == utils.DEFAULT_REPORTS_DIR
 
 
-def test_parser_help_uses_english_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
-    localization.clear_translation_cache()
-    monkeypatch.delenv(localization.LANG_ENV_VAR, raising=False)
-
-    parser_obj = parser.build_parser()
-    help_text = parser_obj.format_help()
+def test_parser_help_uses_english_by_default(
+    built_parser: argparse.ArgumentParser,
+) -> None:
+    help_text = built_parser.format_help()
 
     assert (
         "Directory (relative to the root) to ignore while searching for files."
@@ -173,12 +393,11 @@ def test_parser_help_uses_english_by_default(monkeypatch: pytest.MonkeyPatch) ->
 
 
 def test_parser_version_reports_package_version(
+    built_parser: argparse.ArgumentParser,
     capsys: pytest.CaptureFixture[str],
 ) -> None:
-    parser_obj = parser.build_parser()
-
     with pytest.raises(SystemExit) as excinfo:
-        parser_obj.parse_args(["--version"])
+        built_parser.parse_args(["--version"])
 
     assert excinfo.value.code == 0
     captured = capsys.readouterr()
@@ -190,10 +409,10 @@ def test_run_cli_emits_ai_summary(
     monkeypatch: pytest.MonkeyPatch,
     tmp_path: Path,
     capsys: pytest.CaptureFixture[str],
+    project_ro: Path,
 ) -> None:
-    project = _create_project(tmp_path)
     diff_path = tmp_path / "change.diff"
-    diff_path.write_text(SAMPLE_DIFF, encoding="utf-8")
+    diff_path.write_bytes(_SAMPLE_DIFF_BYTES)
 
     monkeypatch.setattr(cli, "generate_ai_summary", lambda session: "AI summary output")
 
@@ -201,7 +420,7 @@ def test_run_cli_emits_ai_summary(
         [
             str(diff_path),
             "--root",
-            str(project),
+            str(project_ro),
             "--dry-run",
             "--summary-format",
             "ai",
@@ -234,20 +453,19 @@ def test_build_parser_uses_config_defaults(tmp_path: Path) -> None:
     assert expected_snippet.replace(" ", "") in normalized_help
 
 
-def test_apply_patchset_dry_run(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_dry_run(project_ro: Path) -> None:
     session = cli.apply_patchset(
-        PatchSet(SAMPLE_DIFF),
-        project,
+        _parsed_patch(SAMPLE_DIFF),
+        project_ro,
         dry_run=True,
         threshold=0.85,
     )
 
-    target = project / "sample.txt"
+    backup_base = utils.default_backup_base()
+    target = project_ro / "sample.txt"
     assert target.read_text(encoding="utf-8") == "old line\nline2\n"
     assert session.dry_run is True
-    assert session.backup_dir.parent == utils.default_backup_base()
+    assert session.backup_dir.parent == backup_base
     assert session.backup_dir.name == format_session_timestamp(session.started_at)
     assert not session.backup_dir.exists()
     assert session.report_json_path is not None
@@ -255,7 +473,7 @@ def test_apply_patchset_dry_run(tmp_path: Path) -> None:
     assert session.report_json_path.exists()
     assert session.report_txt_path.exists()
     expected_dir = utils.default_session_report_dir(session.started_at)
-    assert utils.default_backup_base() in expected_dir.parents
+    assert backup_base in expected_dir.parents
     assert expected_dir.parent == utils.DEFAULT_REPORTS_DIR
     assert session.report_json_path.parent == expected_dir
     assert session.report_txt_path.parent == expected_dir
@@ -268,13 +486,11 @@ def test_apply_patchset_dry_run(tmp_path: Path) -> None:
     assert file_result.file_type == "text"
 
 
-def test_apply_patchset_invalid_threshold(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_invalid_threshold(project_ro: Path) -> None:
     with pytest.raises(executor.CLIError):
         executor.apply_patchset(
-            PatchSet(SAMPLE_DIFF),
-            project,
+            _parsed_patch(SAMPLE_DIFF),
+            project_ro,
             dry_run=True,
             threshold=0.0,
         )
@@ -295,30 +511,29 @@ def test_session_report_highlights_missing_changes(tmp_path: Path) -> None:
     assert "No changes were applied to the files." in report
 
 
-def test_apply_patchset_real_run_creates_backup(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-    target = project / "sample.txt"
-    original = target.read_text(encoding="utf-8")
+def test_apply_patchset_real_run_creates_backup(project_rw: Path) -> None:
+    target = project_rw / "sample.txt"
 
     session = cli.apply_patchset(
-        PatchSet(SAMPLE_DIFF),
-        project,
+        _parsed_patch(SAMPLE_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
 
+    backup_base = utils.default_backup_base()
     assert target.read_text(encoding="utf-8") == "new line\nline2\n"
     assert session.backup_dir.parent.name == BACKUP_DIR
-    assert session.backup_dir.parent == utils.default_backup_base()
+    assert session.backup_dir.parent == backup_base
     assert session.backup_dir.name == format_session_timestamp(session.started_at)
     assert session.backup_dir.exists()
 
     backup_copy = session.backup_dir / "sample.txt"
     assert backup_copy.exists()
-    assert backup_copy.read_text(encoding="utf-8") == original
+    assert backup_copy.read_bytes() == _SAMPLE_CONTENT
 
     report_dir = utils.default_session_report_dir(session.started_at)
-    assert utils.default_backup_base() in report_dir.parents
+    assert backup_base in report_dir.parents
     assert report_dir.parent == utils.DEFAULT_REPORTS_DIR
     json_report = report_dir / REPORT_JSON
     text_report = report_dir / REPORT_TXT
@@ -327,19 +542,19 @@ def test_apply_patchset_real_run_creates_backup(tmp_path: Path) -> None:
     assert session.report_json_path == json_report
     assert session.report_txt_path == text_report
 
-    data = json.loads(json_report.read_text(encoding="utf-8"))
+    data = json.loads(json_report.read_bytes())
     assert data["files"][0]["hunks_applied"] == 1
     assert data["files"][0]["file_type"] == "text"
 
 
-def test_apply_patchset_removes_file_and_preserves_backup(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-    target = project / "sample.txt"
-    original = target.read_text(encoding="utf-8")
+def test_apply_patchset_removes_file_and_preserves_backup(
+    project_rw: Path, memfs: dict[Path, str]
+) -> None:
+    target = project_rw / "sample.txt"
 
     session = cli.apply_patchset(
-        PatchSet(REMOVED_DIFF),
-        project,
+        _parsed_patch(REMOVED_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
@@ -347,24 +562,26 @@ def test_apply_patchset_removes_file_and_preserves_backup(tmp_path: Path) -> Non
     assert not target.exists()
     backup_copy = session.backup_dir / "sample.txt"
     assert backup_copy.exists()
-    assert backup_copy.read_text(encoding="utf-8") == original
+    assert backup_copy.read_bytes() == _SAMPLE_CONTENT
 
     file_result = session.results[0]
     assert file_result.hunks_applied == file_result.hunks_total == 1
     assert file_result.file_type == "text"
 
 
-def test_apply_patchset_dry_run_updates_existing_empty_file(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-    target = project / "docs" / "empty.txt"
+def test_apply_patchset_dry_run_updates_existing_empty_file(
+    linked_project: Path,
+) -> None:
+    target = linked_project / "docs" / "empty.txt"
     target.parent.mkdir(parents=True, exist_ok=True)
     target.write_text("", encoding="utf-8")
 
     session = cli.apply_patchset(
-        PatchSet(EXISTING_EMPTY_DIFF),
-        project,
+        _parsed_patch(EXISTING_EMPTY_DIFF),
+        linked_project,
         dry_run=True,
         threshold=0.85,
+        write_report_files=False,
     )
 
     assert target.read_text(encoding="utf-8") == ""
@@ -375,15 +592,16 @@ def test_apply_patchset_dry_run_updates_existing_empty_file(tmp_path: Path) -> N
     assert file_result.decisions and file_result.decisions[0].selected_pos == 0
 
 
-def test_apply_patchset_real_run_updates_existing_empty_file(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-    target = project / "docs" / "empty.txt"
+def test_apply_patchset_real_run_updates_existing_empty_file(
+    project_rw: Path, memfs: dict[Path, str]
+) -> None:
+    target = project_rw / "docs" / "empty.txt"
     target.parent.mkdir(parents=True, exist_ok=True)
     target.write_text("", encoding="utf-8")
 
     session = cli.apply_patchset(
-        PatchSet(EXISTING_EMPTY_DIFF),
-        project,
+        _parsed_patch(EXISTING_EMPTY_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
@@ -392,7 +610,7 @@ def test_apply_patchset_real_run_updates_existing_empty_file(tmp_path: Path) ->
     assert session.backup_dir.exists()
     backup_file_path = session.backup_dir / "docs" / "empty.txt"
     assert backup_file_path.exists()
-    assert backup_file_path.read_text(encoding="utf-8") == ""
+    assert backup_file_path.read_bytes() == b""
     assert len(session.results) == 1
     file_result = session.results[0]
     assert file_result.skipped_reason is None
@@ -400,17 +618,16 @@ def test_apply_patchset_real_run_updates_existing_empty_file(tmp_path: Path) ->
     assert file_result.decisions and file_result.decisions[0].selected_pos == 0
 
 
-def test_apply_patchset_dry_run_adds_new_file(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_dry_run_adds_new_file(project_ro: Path) -> None:
     session = cli.apply_patchset(
-        PatchSet(ADDED_DIFF),
-        project,
+        _parsed_patch(ADDED_DIFF),
+        project_ro,
         dry_run=True,
         threshold=0.85,
+        write_report_files=False,
     )
 
-    target = project / "docs" / "newfile.txt"
+    target = project_ro / "docs" / "newfile.txt"
     assert not target.exists()
     assert len(session.results) == 1
 
@@ -425,17 +642,17 @@ def test_apply_patchset_dry_run_adds_new_file(tmp_path: Path) -> None:
     assert file_result.decisions[0].selected_pos == 0
 
 
-def test_apply_patchset_real_run_adds_new_file(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_real_run_adds_new_file(
+    project_rw: Path, memfs: dict[Path, str]
+) -> None:
     session = cli.apply_patchset(
-        PatchSet(ADDED_DIFF),
-        project,
+        _parsed_patch(ADDED_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
 
-    target = project / "docs" / "newfile.txt"
+    target = project_rw / "docs" / "newfile.txt"
     assert target.exists()
     assert target.read_text(encoding="utf-8") == "first line\nsecond line\n"
     assert session.backup_dir.exists()
@@ -453,18 +670,18 @@ def test_apply_patchset_real_run_adds_new_file(tmp_path: Path) -> None:
     assert file_result.decisions[0].strategy == "new-file"
 
 
-def test_apply_patchset_handles_rename(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_handles_rename(
+    project_rw: Path, memfs: dict[Path, str]
+) -> None:
     session = cli.apply_patchset(
-        PatchSet(RENAME_DIFF),
-        project,
+        _parsed_patch(RENAME_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
 
-    renamed = project / "renamed.txt"
-    original = project / "sample.txt"
+    renamed = project_rw / "renamed.txt"
+    original = project_rw / "sample.txt"
     assert renamed.exists()
     assert renamed.read_text(encoding="utf-8") == "renamed line\nline2\n"
     assert not original.exists()
@@ -476,18 +693,16 @@ def test_apply_patchset_handles_rename(tmp_path: Path) -> None:
     assert file_result.hunks_applied == file_result.hunks_total == 1
 
 
-def test_apply_patchset_handles_copy(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_handles_copy(project_rw: Path, memfs: dict[Path, str]) -> None:
     session = cli.apply_patchset(
-        PatchSet(COPY_DIFF),
-        project,
+        _parsed_patch(COPY_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
 
-    new_file = project / "docs" / "copied.txt"
-    source = project / "sample.txt"
+    new_file = project_rw / "docs" / "copied.txt"
+    source = project_rw / "sample.txt"
     assert source.exists()
     assert source.read_text(encoding="utf-8") == "old line\nline2\n"
     assert new_file.exists()
@@ -501,15 +716,17 @@ def test_apply_patchset_handles_copy(tmp_path: Path) -> None:
 
 
 def test_apply_patchset_rejects_paths_outside_root(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
+    project = tmp_path / "project"
+    project.mkdir()
     outside = tmp_path / "outside.txt"
     outside.write_text("external\n", encoding="utf-8")
 
     session = cli.apply_patchset(
-        PatchSet(OUTSIDE_DIFF),
+        _parsed_patch(OUTSIDE_DIFF),
         project,
         dry_run=False,
         threshold=0.85,
+        write_report_files=False,
     )
 
     assert outside.read_text(encoding="utf-8") == "external\n"
@@ -521,25 +738,25 @@ def test_apply_patchset_rejects_paths_outside_root(tmp_path: Path) -> None:
     assert file_result.hunks_total == 1
 
 
-def test_apply_patchset_handles_rename_only(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_handles_rename_only(
+    project_rw: Path, memfs: dict[Path, str]
+) -> None:
     session = cli.apply_patchset(
-        PatchSet(RENAME_ONLY_DIFF),
-        project,
+        _parsed_patch(RENAME_ONLY_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
 
-    old_path = project / "sample.txt"
-    new_path = project / "docs" / "renamed.txt"
+    old_path = project_rw / "sample.txt"
+    new_path = project_rw / "docs" / "renamed.txt"
     backup_path = session.backup_dir / "sample.txt"
 
     assert not old_path.exists()
     assert new_path.exists()
     assert new_path.read_text(encoding="utf-8") == "old line\nline2\n"
     assert backup_path.exists()
-    assert backup_path.read_text(encoding="utf-8") == "old line\nline2\n"
+    assert backup_path.read_bytes() == _SAMPLE_CONTENT
 
     assert len(session.results) == 1
     file_result = session.results[0]
@@ -550,25 +767,25 @@ def test_apply_patchset_handles_rename_only(tmp_path: Path) -> None:
     assert file_result.file_path == new_path
 
 
-def test_apply_patchset_handles_rename_with_modification(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
+def test_apply_patchset_handles_rename_with_modification(
+    project_rw: Path, memfs: dict[Path, str]
+) -> None:
     session = cli.apply_patchset(
-        PatchSet(RENAME_WITH_EDIT_DIFF),
-        project,
+        _parsed_patch(RENAME_WITH_EDIT_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
     )
 
-    old_path = project / "sample.txt"
-    new_path = project / "docs" / "renamed.txt"
+    old_path = project_rw / "sample.txt"
+    new_path = project_rw / "docs" / "renamed.txt"
     backup_path = session.backup_dir / "sample.txt"
 
     assert not old_path.exists()
     assert new_path.exists()
     assert new_path.read_text(encoding="utf-8") == "new line\nline2\n"
     assert backup_path.exists()
-    assert backup_path.read_text(encoding="utf-8") == "old line\nline2\n"
+    assert backup_path.read_bytes() == _SAMPLE_CONTENT
 
     assert len(session.results) == 1
     file_result = session.results[0]
@@ -580,160 +797,146 @@ def test_apply_patchset_handles_rename_with_modification(tmp_path: Path) -> None
     assert file_result.file_path == new_path
 
 
-def test_apply_patchset_custom_report_paths(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
-    json_dest = tmp_path / "reports" / "custom" / "apply.json"
-    txt_dest = tmp_path / "reports" / "apply.txt"
+@typed_parametrize(
+    "options, expected_json, expected_txt, on_disk",
+    [
+        (
+            {
+                "report_json": "reports/custom/apply.json",
+                "report_txt": "reports/apply.txt",
+            },
+            "reports/custom/apply.json",
+            "reports/apply.txt",
+            True,
+        ),
+        (
+            {"report_json": "reports/only.json", "write_report_txt": False},
+            "reports/only.json",
+            None,
+            False,
+        ),
+        ({"write_report_files": False}, None, None, False),
+    ],
+    ids=["custom-paths", "json-only", "disabled"],
+)
+def test_apply_patchset_report_options(
+    tmp_path: Path,
+    project_rw: Path,
+    request: pytest.FixtureRequest,
+    options: dict[str, object],
+    expected_json: Optional[str],
+    expected_txt: Optional[str],
+    on_disk: bool,
+) -> None:
+    # The custom-path case goes through the real ``write_reports`` so the
+    # destinations chosen by ``apply_patchset`` are checked on disk.
+    reports: dict[Path, str] = {} if on_disk else request.getfixturevalue("memfs")
+    kwargs = {
+        key: tmp_path / value if isinstance(value, str) else value
+        for key, value in options.items()
+    }
+    json_dest = tmp_path / expected_json if expected_json else None
+    txt_dest = tmp_path / expected_txt if expected_txt else None
 
     session = cli.apply_patchset(
-        PatchSet(SAMPLE_DIFF),
-        project,
+        _parsed_patch(SAMPLE_DIFF),
+        project_rw,
         dry_run=False,
         threshold=0.85,
-        report_json=json_dest,
-        report_txt=txt_dest,
+        **kwargs,  # type: ignore[arg-type]
     )
 
     assert session.report_json_path == json_dest
     assert session.report_txt_path == txt_dest
-    assert json_dest.exists()
-    assert txt_dest.exists()
-    default_dir = utils.default_session_report_dir(session.started_at)
-    assert utils.default_backup_base() in default_dir.parents
-    assert not (default_dir / REPORT_JSON).exists()
-    assert not (default_dir / REPORT_TXT).exists()
-
-    data = json.loads(json_dest.read_text(encoding="utf-8"))
-    assert data["files"][0]["hunks_applied"] == 1
-    assert data["files"][0]["file_type"] == "text"
-
-
-def test_apply_patchset_no_report(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-
-    session = cli.apply_patchset(
-        PatchSet(SAMPLE_DIFF),
-        project,
-        dry_run=False,
-        threshold=0.85,
-        write_report_files=False,
-    )
-
-    assert session.report_json_path is None
-    assert session.report_txt_path is None
     default_dir = utils.default_session_report_dir(session.started_at)
     assert utils.default_backup_base() in default_dir.parents
-    assert not (default_dir / REPORT_JSON).exists()
-    assert not (default_dir / REPORT_TXT).exists()
-
-
-def test_apply_patchset_reports_ambiguous_candidates(tmp_path: Path) -> None:
-    project = tmp_path / "project"
-    project.mkdir()
-
-    src_dir = project / "src/app"
-    tests_dir = project / "tests/app"
-    src_dir.mkdir(parents=True)
-    tests_dir.mkdir(parents=True)
-
-    (src_dir / "sample.txt").write_text("old line\n", encoding="utf-8")
-    (tests_dir / "sample.txt").write_text("old line\n", encoding="utf-8")
-
-    session = cli.apply_patchset(
-        PatchSet(AMBIGUOUS_DIFF),
-        project,
-        dry_run=True,
-        threshold=0.85,
-        interactive=False,
-    )
-
-    assert len(session.results) == 1
-    file_result = session.results[0]
-    assert file_result.skipped_reason is not None
-    assert "src/app/sample.txt" in file_result.skipped_reason
-    assert "tests/app/sample.txt" in file_result.skipped_reason
-    assert file_result.file_type == "text"
+    if on_disk:
+        reports = {
+            path: path.read_text(encoding="utf-8")
+            for path in (tmp_path / "reports").rglob("*")
+            if path.is_file()
+        }
+    assert set(reports) == {path for path in (json_dest, txt_dest) if path}
 
-    report = session.to_txt()
-    assert "src/app/sample.txt" in report
-    assert "tests/app/sample.txt" in report
+    if json_dest is not None:
+        data = json.loads(reports[json_dest])
+        assert data["files"][0]["hunks_applied"] == 1
+        assert data["files"][0]["file_type"] == "text"
 
 
 def test_apply_patchset_interactive_candidate_selection(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    stdin_feeder: Callable[..., None], ambiguous_project: Path
 ) -> None:
-    project = tmp_path / "project"
-    project.mkdir()
-
-    src_dir = project / "src/app"
-    tests_dir = project / "tests/app"
-    src_dir.mkdir(parents=True)
-    tests_dir.mkdir(parents=True)
-
-    (src_dir / "sample.txt").write_text("old line\n", encoding="utf-8")
-    (tests_dir / "sample.txt").write_text("old line\n", encoding="utf-8")
-
-    monkeypatch.setattr("builtins.input", lambda _: "2")
+    stdin_feeder("2")
 
     session = cli.apply_patchset(
-        PatchSet(AMBIGUOUS_DIFF),
-        project,
+        _parsed_patch(AMBIGUOUS_DIFF),
+        ambiguous_project,
         dry_run=True,
         threshold=0.85,
+        write_report_files=False,
     )
 
     assert len(session.results) == 1
     file_result = session.results[0]
     assert file_result.skipped_reason is None
-    assert file_result.relative_to_root == "tests/app/sample.txt"
+    assert file_result.relative_to_root == _EXPECTED_AMBIGUOUS[1]
     assert file_result.hunks_applied == file_result.hunks_total == 1
     assert file_result.file_type == "text"
 
 
-def test_apply_patchset_skipped_reason_lists_candidates(tmp_path: Path) -> None:
-    project = tmp_path / "project"
-    project.mkdir()
-
-    first_dir = project / "docs"
-    second_dir = project / "legacy"
-    first_dir.mkdir()
-    second_dir.mkdir()
-
-    for directory in (first_dir, second_dir):
-        (directory / "sample.txt").write_text("old line\nline2\n", encoding="utf-8")
+@typed_parametrize(
+    "project_fixture, diff_text, expected",
+    [
+        ("ambiguous_project", AMBIGUOUS_DIFF, _EXPECTED_AMBIGUOUS),
+        ("duplicate_project", SAMPLE_DIFF, _EXPECTED_DUPLICATE_CANDIDATES),
+    ],
+    ids=["nested", "siblings"],
+)
+def test_apply_patchset_skipped_reason_lists_candidates(
+    request: pytest.FixtureRequest,
+    project_fixture: str,
+    diff_text: str,
+    expected: tuple[str, ...],
+) -> None:
+    project: Path = request.getfixturevalue(project_fixture)
 
     session = cli.apply_patchset(
-        PatchSet(SAMPLE_DIFF),
+        _parsed_patch(diff_text),
         project,
         dry_run=True,
         threshold=0.85,
         interactive=False,
+        write_report_files=False,
     )
 
     assert len(session.results) == 1
     file_result = session.results[0]
     assert file_result.skipped_reason is not None
-    assert "docs/sample.txt" in file_result.skipped_reason
-    assert "legacy/sample.txt" in file_result.skipped_reason
+    for fragment in expected:
+        assert fragment in file_result.skipped_reason
+    assert file_result.file_type == "text"
 
+    report = session.to_txt()
+    for fragment in expected:
+        assert fragment in report
 
-def test_load_patch_applies_non_utf8_diff(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "non-utf8.diff"
-    patch_path.write_bytes(NON_UTF8_DIFF.encode("utf-16"))
 
-    patch = cli.load_patch(str(patch_path))
+def test_load_patch_applies_non_utf8_diff(
+    project_rw: Path, utf16_diff_file: Path
+) -> None:
+    patch = cli.load_patch(str(utf16_diff_file))
     assert "nuova riga con caffè" in str(patch)
 
     session = cli.apply_patchset(
         patch,
-        project,
+        project_rw,
         dry_run=False,
         threshold=0.85,
+        write_report_files=False,
     )
 
-    target = project / "sample.txt"
+    target = project_rw / "sample.txt"
     assert target.read_text(encoding="utf-8") == "nuova riga con caffè\nline2\n"
 
     file_result = session.results[0]
@@ -741,65 +944,42 @@ def test_load_patch_applies_non_utf8_diff(tmp_path: Path) -> None:
     assert file_result.hunks_applied == file_result.hunks_total == 1
 
 
-def test_load_patch_respects_explicit_encoding(tmp_path: Path) -> None:
-    patch_path = tmp_path / "explicit.diff"
-    patch_path.write_text(NON_UTF8_DIFF, encoding="utf-16")
-
-    patch = cli.load_patch(str(patch_path), encoding="utf-16")
+def test_load_patch_respects_explicit_encoding(utf16_diff_file: Path) -> None:
+    patch = cli.load_patch(str(utf16_diff_file), encoding="utf-16")
 
     assert "nuova riga con caffè" in str(patch)
 
 
 def test_load_patch_logs_warning_on_fallback(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    sample_diff_file: Path,
 ) -> None:
-    patch_path = tmp_path / "fallback.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
-    real_decode = utils.decode_bytes
-
     def fake_decode(data: bytes) -> tuple[str, str, bool]:
-        text, encoding, _ = real_decode(data)
-        return text, encoding, True
+        return "--- a/x\n+++ b/x\n", "utf-8", True
 
     monkeypatch.setattr(executor, "decode_bytes", fake_decode)
 
-    with caplog.at_level(logging.WARNING):
-        patch = cli.load_patch(str(patch_path))
+    patch = cli.load_patch(str(sample_diff_file))
 
     assert isinstance(patch, PatchSet)
-    assert any("fallback" in record.message.lower() for record in caplog.records)
+    assert [patched.path for patched in patch] == ["x"]
+    assert executor.FALLBACK_LOG_EVENT in _log_events(caplog)
 
 
 def test_load_patch_reads_stdin_with_fallback(
     monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
 ) -> None:
-    encoded = NON_UTF8_DIFF.encode("utf-16")
-    decoded = encoded.decode("utf-16")
-
-    fake_stdin = types.SimpleNamespace(buffer=io.BytesIO(encoded))
-
-    def _read() -> str:
-        fake_stdin.buffer.seek(0)
-        return decoded
-
-    fake_stdin.read = _read
+    fake_stdin = types.SimpleNamespace(buffer=io.BytesIO(NON_UTF8_DIFF_UTF16))
     monkeypatch.setattr(executor.sys, "stdin", fake_stdin)
 
-    real_decode = utils.decode_bytes
+    _force_decoding_fallback(monkeypatch)
 
-    def fake_decode(data: bytes) -> tuple[str, str, bool]:
-        text, encoding, _ = real_decode(data)
-        return text, encoding, True
-
-    monkeypatch.setattr(executor, "decode_bytes", fake_decode)
-
-    with caplog.at_level(logging.WARNING):
-        patch = cli.load_patch("-")
+    patch = cli.load_patch("-")
 
     assert isinstance(patch, PatchSet)
     assert "nuova riga con caffè" in str(patch)
-    assert any("fallback" in record.message.lower() for record in caplog.records)
+    assert executor.FALLBACK_LOG_EVENT in _log_events(caplog)
     assert any("stdin" in record.message.lower() for record in caplog.records)
 
 
@@ -818,7 +998,7 @@ def test_load_patch_supports_home_shortcut(
     fake_home = tmp_path / "home"
     fake_home.mkdir()
     patch_path = fake_home / "shortcut.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
+    patch_path.write_bytes(_SAMPLE_DIFF_BYTES)
 
     def fake_expanduser(value: str) -> str:
         if value.startswith("~"):
@@ -833,16 +1013,17 @@ def test_load_patch_supports_home_shortcut(
     assert patch[0].path == "sample.txt"
 
 
-def test_load_patch_invalid_diff_raises_clierror(tmp_path: Path) -> None:
+def test_load_patch_invalid_diff_raises_clierror(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
     invalid = tmp_path / "invalid.diff"
-    invalid.write_text(
-        """--- a/file
-+++ b/file
-@@ -1 +1 @@
-@@ -1 +1 @@
-""",
-        encoding="utf-8",
-    )
+    invalid.write_bytes(_SAMPLE_DIFF_BYTES)
+
+    def failing_patchset(text: str) -> PatchSet:
+        del text
+        raise UnidiffParseError("Hunk is shorter than expected: @@ -1,0 +1,0 @@")
+
+    monkeypatch.setattr(executor, "PatchSet", failing_patchset)
 
     with pytest.raises(cli.CLIError) as excinfo:
         cli.load_patch(str(invalid))
@@ -853,20 +1034,10 @@ def test_load_patch_invalid_diff_raises_clierror(tmp_path: Path) -> None:
 
 
 def test_run_cli_requires_root_argument(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    argparse_raises: None, sample_diff_file: Path
 ) -> None:
-    patch_path = tmp_path / "input.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
-    def fake_exit(
-        self: argparse.ArgumentParser, status: int = 0, message: str | None = None
-    ) -> None:
-        raise cli.CLIError(message.strip() if message else "parser exited")
-
-    monkeypatch.setattr(argparse.ArgumentParser, "exit", fake_exit, raising=False)
-
     with pytest.raises(cli.CLIError) as excinfo:
-        cli.run_cli([str(patch_path)])
+        cli.run_cli([str(sample_diff_file)])
 
     message = str(excinfo.value)
     assert "--root" in message
@@ -874,28 +1045,20 @@ def test_run_cli_requires_root_argument(
 
 
 def test_run_cli_rejects_report_conflicts(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    argparse_raises: None,
+    tmp_path: Path,
+    project_ro: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "report-options.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
-    def fake_exit(
-        self: argparse.ArgumentParser, status: int = 0, message: str | None = None
-    ) -> None:
-        raise cli.CLIError(message.strip() if message else "parser exited")
-
-    monkeypatch.setattr(argparse.ArgumentParser, "exit", fake_exit, raising=False)
-
     with pytest.raises(cli.CLIError) as excinfo:
         cli.run_cli(
             [
                 "--root",
-                str(project),
+                str(project_ro),
                 "--no-report",
                 "--report-json",
                 str(tmp_path / "custom.json"),
-                str(patch_path),
+                str(sample_diff_file),
             ]
         )
 
@@ -937,37 +1100,30 @@ def test_run_cli_can_include_default_excludes(tmp_path: Path) -> None:
 
 
 def test_apply_patchset_logs_warning_on_fallback(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    project_ro: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-
-    real_decode = utils.decode_bytes
-
-    def fake_decode(data: bytes) -> tuple[str, str, bool]:
-        text, encoding, _ = real_decode(data)
-        return text, encoding, True
-
-    monkeypatch.setattr(executor, "decode_bytes", fake_decode)
+    _force_decoding_fallback(monkeypatch)
 
-    with caplog.at_level(logging.WARNING):
-        session = cli.apply_patchset(
-            PatchSet(SAMPLE_DIFF),
-            project,
-            dry_run=True,
-            threshold=0.85,
-        )
+    session = cli.apply_patchset(
+        _parsed_patch(SAMPLE_DIFF),
+        project_ro,
+        dry_run=True,
+        threshold=0.85,
+        write_report_files=False,
+    )
 
     assert session.results
-    assert any("fallback" in record.message.lower() for record in caplog.records)
+    assert executor.FALLBACK_LOG_EVENT in _log_events(caplog)
 
 
 def test_run_cli_uses_config_defaults(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    project_ro: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "config.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
     config = AppConfig(
         threshold=0.91,
         exclude_dirs=("foo", "bar"),
@@ -982,13 +1138,13 @@ def test_run_cli_uses_config_defaults(
     def fake_load_patch(source: str, *, encoding: str | None = None) -> PatchSet:
         captured["source"] = source
         captured["encoding"] = encoding
-        return PatchSet(SAMPLE_DIFF)
+        return _parsed_patch(SAMPLE_DIFF)
 
     def fake_apply_patchset(
         patch: PatchSet,
         project_root: Path,
         **kwargs: object,
-    ) -> _DummySession:
+    ) -> types.SimpleNamespace:
         captured["threshold"] = kwargs.get("threshold")
         captured["exclude_dirs"] = kwargs.get("exclude_dirs")
         captured["backup_base"] = kwargs.get("backup_base")
@@ -1002,9 +1158,9 @@ def test_run_cli_uses_config_defaults(
     exit_code = cli.run_cli(
         [
             "--root",
-            str(project),
+            str(project_ro),
             "--dry-run",
-            str(patch_path),
+            str(sample_diff_file),
         ]
     )
 
@@ -1015,60 +1171,58 @@ def test_run_cli_uses_config_defaults(
     assert captured["config"] is config
 
 
-def test_run_cli_configures_requested_log_level(tmp_path: Path) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "run-cli.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
-    root_logger = logging.getLogger()
-    previous_handlers = root_logger.handlers[:]
-    previous_level = root_logger.level
+def test_run_cli_configures_requested_log_level(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    project_ro: Path,
+    sample_diff_file: Path,
+) -> None:
+    logging_calls: list[dict[str, Any]] = []
+    monkeypatch.setattr(
+        logging, "basicConfig", lambda **kwargs: logging_calls.append(kwargs)
+    )
+    monkeypatch.setattr(
+        cli,
+        "apply_patchset",
+        lambda *args, **kwargs: _create_dummy_session(tmp_path),
+    )
 
-    try:
-        exit_code = cli.run_cli(
-            [
-                "--root",
-                str(project),
-                "--dry-run",
-                "--log-level",
-                "debug",
-                str(patch_path),
-            ]
-        )
-        assert exit_code == 0
+    exit_code = cli.run_cli(
+        [
+            "--root",
+            str(project_ro),
+            "--dry-run",
+            "--log-level",
+            "debug",
+            str(sample_diff_file),
+        ]
+    )
+    assert exit_code == 0
 
-        configured_logger = logging.getLogger()
-        assert configured_logger.level == logging.DEBUG
-        assert any(
-            isinstance(handler, logging.StreamHandler) and handler.stream is sys.stderr
-            for handler in configured_logger.handlers
-        )
-    finally:
-        configured_logger = logging.getLogger()
-        for handler in configured_logger.handlers[:]:
-            configured_logger.removeHandler(handler)
-        for handler in previous_handlers:
-            configured_logger.addHandler(handler)
-        configured_logger.setLevel(previous_level)
+    assert len(logging_calls) == 1
+    assert logging_calls[0]["level"] == logging.DEBUG
+    assert logging_calls[0]["stream"] is sys.stderr
+    assert logging_calls[0]["force"] is True
 
 
 def test_run_cli_emits_logs_to_stderr(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    project_ro: Path,
+    sample_diff_file: Path,
+    preserve_root_logger: logging.Logger,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "log-output.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
     monkeypatch.setattr(cli, "load_config", lambda: AppConfig())
 
     def fake_load_patch(source: str, *, encoding: str | None = None) -> PatchSet:
-        return PatchSet(SAMPLE_DIFF)
+        return _parsed_patch(SAMPLE_DIFF)
 
     def fake_apply_patchset(
         patch: PatchSet,
         project_root: Path,
         **kwargs: object,
-    ) -> _DummySession:
+    ) -> types.SimpleNamespace:
         cli.logger.debug("verbose log message")
         return _create_dummy_session(tmp_path)
 
@@ -1076,28 +1230,16 @@ def test_run_cli_emits_logs_to_stderr(
     monkeypatch.setattr(cli, "apply_patchset", fake_apply_patchset)
     monkeypatch.setattr(cli, "session_completed", lambda session: True)
 
-    root_logger = logging.getLogger()
-    previous_handlers = root_logger.handlers[:]
-    previous_level = root_logger.level
-
-    try:
-        exit_code = cli.run_cli(
-            [
-                "--root",
-                str(project),
-                "--dry-run",
-                "--log-level",
-                "debug",
-                str(patch_path),
-            ]
-        )
-    finally:
-        configured_logger = logging.getLogger()
-        for handler in configured_logger.handlers[:]:
-            configured_logger.removeHandler(handler)
-        for handler in previous_handlers:
-            configured_logger.addHandler(handler)
-        configured_logger.setLevel(previous_level)
+    exit_code = cli.run_cli(
+        [
+            "--root",
+            str(project_ro),
+            "--dry-run",
+            "--log-level",
+            "debug",
+            str(sample_diff_file),
+        ]
+    )
 
     captured = capsys.readouterr()
 
@@ -1108,23 +1250,21 @@ def test_run_cli_emits_logs_to_stderr(
 
 
 def test_run_cli_prints_json_summary_and_skips_text_report(
-    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    project_ro: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "json-summary.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
-    utils.DEFAULT_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-    before_reports = set(utils.DEFAULT_REPORTS_DIR.glob("*"))
+    sessions = _record_sessions(monkeypatch)
 
     exit_code = cli.run_cli(
         [
             "--root",
-            str(project),
+            str(project_ro),
             "--dry-run",
             "--summary-format",
             "json",
-            str(patch_path),
+            str(sample_diff_file),
         ]
     )
 
@@ -1138,36 +1278,31 @@ def test_run_cli_prints_json_summary_and_skips_text_report(
     assert "files" in data
     assert "Summary" not in captured.out
 
-    after_reports = set(utils.DEFAULT_REPORTS_DIR.glob("*"))
-    new_reports = [path for path in after_reports if path not in before_reports]
+    assert len(sessions) == 1
+    report_dir = utils.default_session_report_dir(sessions[0].started_at)
     try:
-        assert len(new_reports) == 1
-        report_dir = new_reports[0]
         assert (report_dir / REPORT_JSON).exists()
         assert not (report_dir / REPORT_TXT).exists()
     finally:
-        for path in new_reports:
-            shutil.rmtree(path, ignore_errors=True)
+        shutil.rmtree(report_dir, ignore_errors=True)
 
 
 def test_run_cli_text_summary_skips_json_report(
-    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    project_ro: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "text-summary.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
-    utils.DEFAULT_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-    before_reports = set(utils.DEFAULT_REPORTS_DIR.glob("*"))
+    sessions = _record_sessions(monkeypatch)
 
     exit_code = cli.run_cli(
         [
             "--root",
-            str(project),
+            str(project_ro),
             "--dry-run",
             "--summary-format",
             "text",
-            str(patch_path),
+            str(sample_diff_file),
         ]
     )
 
@@ -1175,114 +1310,82 @@ def test_run_cli_text_summary_skips_json_report(
 
     assert exit_code == 0
     assert "Summary" in captured.out
-    after_reports = set(utils.DEFAULT_REPORTS_DIR.glob("*"))
-    new_reports = [path for path in after_reports if path not in before_reports]
+
+    assert len(sessions) == 1
+    report_dir = utils.default_session_report_dir(sessions[0].started_at)
     try:
-        assert len(new_reports) == 1
-        report_dir = new_reports[0]
         assert not (report_dir / REPORT_JSON).exists()
         assert (report_dir / REPORT_TXT).exists()
     finally:
-        for path in new_reports:
-            shutil.rmtree(path, ignore_errors=True)
-
-
-class _DummySession:
-    def __init__(self, tmp_path: Path) -> None:
-        self.dry_run = True
-        self.report_json_path: Path | None = None
-        self.report_txt_path: Path | None = None
-        self.results: list[object] = []
-        self.backup_dir: Path = tmp_path / "backups"
-        self.backup_dir.mkdir(exist_ok=True)
+        shutil.rmtree(report_dir, ignore_errors=True)
 
-    def to_txt(self) -> str:
-        return "Summary"
 
-    def to_json(self) -> dict[str, object]:
-        return {"summary": self.to_txt()}
-
-
-def _create_dummy_session(tmp_path: Path) -> _DummySession:
-    return _DummySession(tmp_path)
+def _create_dummy_session(tmp_path: Path) -> types.SimpleNamespace:
+    return types.SimpleNamespace(
+        dry_run=True,
+        report_json_path=None,
+        report_txt_path=None,
+        results=[],
+        backup_dir=tmp_path / "backups",
+        to_txt=lambda: "Summary",
+        to_json=lambda: {"summary": "Summary"},
+    )
 
 
-def test_run_cli_passes_explicit_encoding(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
-) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "input.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
+@typed_fixture()
+def mocked_cli(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> dict[str, object]:
+    """Stub the load/apply steps of ``run_cli`` and record ``load_patch`` args."""
 
     captured: dict[str, object] = {}
 
     def fake_load_patch(source: str, *, encoding: str | None = None) -> PatchSet:
         captured["encoding"] = encoding
         captured["source"] = source
-        return PatchSet(SAMPLE_DIFF)
-
-    def fake_apply_patchset(*args: object, **kwargs: object) -> object:
-        return _create_dummy_session(tmp_path)
+        return _parsed_patch(SAMPLE_DIFF)
 
     monkeypatch.setattr(cli, "load_patch", fake_load_patch)
-    monkeypatch.setattr(cli, "apply_patchset", fake_apply_patchset)
-    monkeypatch.setattr(cli, "session_completed", lambda session: True)
-
-    exit_code = cli.run_cli(
-        [
-            "--root",
-            str(project),
-            "--dry-run",
-            "--encoding",
-            "utf-16",
-            str(patch_path),
-        ]
+    monkeypatch.setattr(
+        cli,
+        "apply_patchset",
+        lambda *args, **kwargs: _create_dummy_session(tmp_path),
     )
-
-    assert exit_code == 0
-    assert captured["encoding"] == "utf-16"
-    assert captured["source"] == str(patch_path)
+    monkeypatch.setattr(cli, "session_completed", lambda session: True)
+    return captured
 
 
-def test_run_cli_defaults_to_auto_encoding(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+@typed_parametrize(
+    "extra_args, expected_encoding",
+    [(["--encoding", "utf-16"], "utf-16"), ([], None)],
+    ids=["explicit", "auto"],
+)
+def test_run_cli_passes_encoding_to_load_patch(
+    mocked_cli: dict[str, object],
+    project_ro: Path,
+    sample_diff_file: Path,
+    extra_args: list[str],
+    expected_encoding: Optional[str],
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "input.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
-    captured: dict[str, object] = {}
-
-    def fake_load_patch(source: str, *, encoding: str | None = None) -> PatchSet:
-        captured["encoding"] = encoding
-        return PatchSet(SAMPLE_DIFF)
-
-    def fake_apply_patchset(*args: Any, **kwargs: Any) -> Any:
-        return _create_dummy_session(tmp_path)
-
-    monkeypatch.setattr(cli, "load_patch", fake_load_patch)
-    monkeypatch.setattr(cli, "apply_patchset", fake_apply_patchset)
-    monkeypatch.setattr(cli, "session_completed", lambda session: True)
-
-    exit_code = cli.run_cli(["--root", str(project), "--dry-run", str(patch_path)])
+    exit_code = cli.run_cli(
+        ["--root", str(project_ro), "--dry-run", *extra_args, str(sample_diff_file)]
+    )
 
     assert exit_code == 0
-    assert captured["encoding"] is None
+    assert mocked_cli["encoding"] == expected_encoding
+    assert mocked_cli["source"] == str(sample_diff_file)
 
 
 def test_run_cli_reports_backup_creation_error(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    project_rw: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "input.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
     def failing_backup(*args: object, **kwargs: object) -> None:
         raise OSError("permission denied")
 
     monkeypatch.setattr(executor, "backup_file", failing_backup)
 
-    exit_code = cli.run_cli(["--root", str(project), str(patch_path)])
+    exit_code = cli.run_cli(["--root", str(project_rw), str(sample_diff_file)])
 
     assert exit_code == 1
     captured = capsys.readouterr()
@@ -1292,13 +1395,15 @@ def test_run_cli_reports_backup_creation_error(
 
 
 def test_run_cli_reports_directory_creation_error(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    project_rw: Path,
 ) -> None:
-    project = _create_project(tmp_path)
     patch_path = tmp_path / "newfile.diff"
     patch_path.write_text(ADDED_DIFF, encoding="utf-8")
 
-    target_dir = project / "docs"
+    target_dir = project_rw / "docs"
     original_mkdir = Path.mkdir
 
     def failing_mkdir(self: Path, *args: Any, **kwargs: Any) -> None:
@@ -1309,7 +1414,7 @@ def test_run_cli_reports_directory_creation_error(
     monkeypatch.setattr(Path, "mkdir", failing_mkdir, raising=False)
 
     with pytest.raises(SystemExit) as excinfo:
-        cli.run_cli(["--root", str(project), str(patch_path)])
+        cli.run_cli(["--root", str(project_rw), str(patch_path)])
 
     assert excinfo.value.code == 1
     captured = capsys.readouterr()
@@ -1318,12 +1423,11 @@ def test_run_cli_reports_directory_creation_error(
 
 
 def test_run_cli_reports_write_error(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    project_rw: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "input.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
     def failing_write(path: Path, text: str, encoding: str) -> None:
         del text, encoding
         raise OSError("disk full")
@@ -1331,7 +1435,7 @@ def test_run_cli_reports_write_error(
     monkeypatch.setattr(executor, "write_text_preserving_encoding", failing_write)
 
     with pytest.raises(SystemExit) as excinfo:
-        cli.run_cli(["--root", str(project), str(patch_path)])
+        cli.run_cli(["--root", str(project_rw), str(sample_diff_file)])
 
     assert excinfo.value.code == 1
     captured = capsys.readouterr()
@@ -1340,12 +1444,12 @@ def test_run_cli_reports_write_error(
 
 
 def test_run_cli_reports_prepare_backup_dir_permission_error(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    project_rw: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "input.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
     target = tmp_path / "blocked-backups"
 
     def failing_prepare(*args: object, **kwargs: object) -> Path:
@@ -1355,7 +1459,7 @@ def test_run_cli_reports_prepare_backup_dir_permission_error(
     monkeypatch.setattr(executor, "prepare_backup_dir", failing_prepare)
 
     with pytest.raises(SystemExit) as excinfo:
-        cli.run_cli(["--root", str(project), str(patch_path)])
+        cli.run_cli(["--root", str(project_rw), str(sample_diff_file)])
 
     assert excinfo.value.code == 1
     captured = capsys.readouterr()
@@ -1365,12 +1469,12 @@ def test_run_cli_reports_prepare_backup_dir_permission_error(
 
 
 def test_run_cli_reports_write_session_reports_permission_error(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    project_rw: Path,
+    sample_diff_file: Path,
 ) -> None:
-    project = _create_project(tmp_path)
-    patch_path = tmp_path / "input.diff"
-    patch_path.write_text(SAMPLE_DIFF, encoding="utf-8")
-
     target = tmp_path / "reports" / "session.json"
 
     def failing_reports(*args: object, **kwargs: object) -> None:
@@ -1380,7 +1484,7 @@ def test_run_cli_reports_write_session_reports_permission_error(
     monkeypatch.setattr(executor, "write_session_reports", failing_reports)
 
     with pytest.raises(SystemExit) as excinfo:
-        cli.run_cli(["--root", str(project), str(patch_path)])
+        cli.run_cli(["--root", str(project_rw), str(sample_diff_file)])
 
     assert excinfo.value.code == 1
     captured = capsys.readouterr()
@@ -1421,96 +1525,53 @@ def test_config_show_outputs_json(tmp_path: Path) -> None:
 def test_config_set_updates_values(tmp_path: Path) -> None:
     config_path = tmp_path / "settings.toml"
 
-    message = io.StringIO()
-    result = cli.config_set("threshold", ["0.9"], path=config_path, stream=message)
-
-    assert result == 0
-    assert message.getvalue() == "threshold updated.\n"
-
-    loaded = load_config(config_path)
-    assert loaded.threshold == pytest.approx(0.9)
-
-    cli.config_set(
-        "exclude_dirs",
-        ["foo", "bar,baz"],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    loaded = load_config(config_path)
-    assert loaded.exclude_dirs == ("foo", "bar", "baz")
-
-    cli.config_set(
-        "log_level",
-        ["info"],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    assert load_config(config_path).log_level == "info"
-
-    cli.config_set(
-        "backup_base",
-        [str(tmp_path / "custom")],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    assert load_config(config_path).backup_base == (tmp_path / "custom").expanduser()
-
-    cli.config_set(
-        "dry_run_default",
-        ["false"],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    assert load_config(config_path).dry_run_default is False
-
-    cli.config_set(
-        "write_reports",
-        ["no"],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    assert load_config(config_path).write_reports is False
-
-    cli.config_set(
-        "log_file",
-        [str(tmp_path / "logs" / "session.log")],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    assert (
-        load_config(config_path).log_file
-        == (tmp_path / "logs" / "session.log").expanduser()
-    )
-
-    cli.config_set(
-        "log_max_bytes",
-        ["4096"],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    assert load_config(config_path).log_max_bytes == 4096
-
-    cli.config_set(
-        "log_backup_count",
-        ["2"],
-        path=config_path,
-        stream=io.StringIO(),
-    )
-    assert load_config(config_path).log_backup_count == 2
+    for key, values in [
+        ("threshold", ["0.9"]),
+        ("exclude_dirs", ["foo", "bar,baz"]),
+        ("dry_run_default", ["false"]),
+    ]:
+        message = io.StringIO()
+        result = cli.config_set(key, values, path=config_path, stream=message)
+
+        assert result == 0
+        assert message.getvalue() == f"{key} updated.\n"
+
+    config = load_config(config_path)
+    assert config.threshold == pytest.approx(0.9)
+    assert config.exclude_dirs == ("foo", "bar", "baz")
+    assert config.dry_run_default is False
+
+    updates = [
+        ("log_level", ["info"]),
+        ("backup_base", [str(tmp_path / "custom")]),
+        ("write_reports", ["no"]),
+        ("log_file", [str(tmp_path / "logs" / "session.log")]),
+        ("log_max_bytes", ["4096"]),
+        ("log_backup_count", ["2"]),
+        ("backup_retention_days", ["30"]),
+    ]
+    for key, values in updates:
+        cli._apply_config_value(config, key, values)
+    save_config(config, path=config_path)
 
-    cli.config_set(
-        "backup_retention_days",
-        ["30"],
-        path=config_path,
-        stream=io.StringIO(),
+    expected = AppConfig(
+        threshold=0.9,
+        exclude_dirs=("foo", "bar", "baz"),
+        backup_base=(tmp_path / "custom").expanduser(),
+        log_level="info",
+        dry_run_default=False,
+        write_reports=False,
+        log_file=(tmp_path / "logs" / "session.log").expanduser(),
+        log_max_bytes=4096,
+        log_backup_count=2,
+        backup_retention_days=30,
     )
-    assert load_config(config_path).backup_retention_days == 30
+    assert dataclasses.asdict(load_config(config_path)) == dataclasses.asdict(expected)
 
 
 def test_config_reset_values(tmp_path: Path) -> None:
     config_path = tmp_path / "settings.toml"
-    cli.config_set("threshold", ["0.92"], path=config_path, stream=io.StringIO())
-    cli.config_set("log_level", ["debug"], path=config_path, stream=io.StringIO())
+    save_config(AppConfig(threshold=0.92, log_level="debug"), path=config_path)
 
     cli.config_reset("threshold", path=config_path, stream=io.StringIO())
     loaded = load_config(config_path)
@@ -1521,18 +1582,8 @@ def test_config_reset_values(tmp_path: Path) -> None:
     cli.config_reset(path=config_path, stream=buffer)
     assert "Configuration reset to defaults." in buffer.getvalue()
 
-    defaults = AppConfig()
     reset = load_config(config_path)
-    assert reset.threshold == defaults.threshold
-    assert reset.log_level == defaults.log_level
-    assert reset.exclude_dirs == defaults.exclude_dirs
-    assert reset.backup_base == defaults.backup_base
-    assert reset.dry_run_default == defaults.dry_run_default
-    assert reset.write_reports == defaults.write_reports
-    assert reset.log_file == defaults.log_file
-    assert reset.log_max_bytes == defaults.log_max_bytes
-    assert reset.log_backup_count == defaults.log_backup_count
-    assert reset.backup_retention_days == defaults.backup_retention_days
+    assert dataclasses.asdict(reset) == dataclasses.asdict(AppConfig())
 
 
 def test_run_config_reports_invalid_log_level(
@@ -1641,7 +1692,7 @@ def test_run_download_exe_reports_error(
     [("2", 1, True, 3), ("", 0, False, None)],
 )
 def test_cli_manual_resolver_handles_fuzzy_candidates(
-    monkeypatch: pytest.MonkeyPatch,
+    stdin_feeder: Callable[..., None],
     tmp_path: Path,
     capsys: pytest.CaptureFixture[str],
     user_input: str,
@@ -1656,19 +1707,10 @@ def test_cli_manual_resolver_handles_fuzzy_candidates(
         encoding="utf-8",
     )
 
-    responses = iter([user_input])
-
-    def fake_input(prompt: str) -> str:
-        del prompt
-        try:
-            return next(responses)
-        except StopIteration:
-            return ""
-
-    monkeypatch.setattr("builtins.input", fake_input)
+    stdin_feeder(user_input)
 
     session = executor.apply_patchset(
-        PatchSet(FUZZY_MANUAL_DIFF),
+        _parsed_patch(FUZZY_MANUAL_DIFF),
         project,
         dry_run=True,
         threshold=0.8,
@@ -1701,7 +1743,7 @@ def test_cli_manual_resolver_handles_fuzzy_candidates(
     [("2", 1, True, 4), ("", 0, False, None)],
 )
 def test_cli_manual_resolver_handles_context_candidates(
-    monkeypatch: pytest.MonkeyPatch,
+    stdin_feeder: Callable[..., None],
     tmp_path: Path,
     capsys: pytest.CaptureFixture[str],
     user_input: str,
@@ -1722,19 +1764,10 @@ def test_cli_manual_resolver_handles_context_candidates(
         encoding="utf-8",
     )
 
-    responses = iter([user_input])
-
-    def fake_input(prompt: str) -> str:
-        del prompt
-        try:
-            return next(responses)
-        except StopIteration:
-            return ""
-
-    monkeypatch.setattr("builtins.input", fake_input)
+    stdin_feeder(user_input)
 
     session = executor.apply_patchset(
-        PatchSet(CONTEXT_MANUAL_DIFF),
+        _parsed_patch(CONTEXT_MANUAL_DIFF),
         project,
         dry_run=True,
         threshold=0.7,
@@ -1771,7 +1804,7 @@ def test_cli_auto_accept_resolves_fuzzy_candidates(tmp_path: Path) -> None:
     )
 
     session = executor.apply_patchset(
-        PatchSet(FUZZY_MANUAL_DIFF),
+        _parsed_patch(FUZZY_MANUAL_DIFF),
         project,
         dry_run=True,
         threshold=0.8,
@@ -1805,7 +1838,7 @@ def test_cli_auto_accept_resolves_context_candidates(tmp_path: Path) -> None:
     )
 
     session = executor.apply_patchset(
-        PatchSet(CONTEXT_MANUAL_DIFF),
+        _parsed_patch(CONTEXT_MANUAL_DIFF),
         project,
         dry_run=True,
         threshold=0.7,
@@ -1,26 +1,19 @@
+from __future__ import annotations
+
+import os
+import stat
 from pathlib import Path
+from typing import Callable
 
 import pytest
 
+from patch_gui import config as config_module
 from patch_gui.config import AppConfig, load_config, save_config
+from tests._pytest_typing import typed_fixture
 
 
 def test_load_config_returns_defaults_when_missing(tmp_path: Path) -> None:
-    config_path = tmp_path / "settings.toml"
-
-    loaded = load_config(path=config_path)
-    defaults = AppConfig()
-
-    assert loaded.threshold == defaults.threshold
-    assert loaded.exclude_dirs == defaults.exclude_dirs
-    assert loaded.backup_base == defaults.backup_base
-    assert loaded.log_level == defaults.log_level
-    assert loaded.dry_run_default == defaults.dry_run_default
-    assert loaded.write_reports == defaults.write_reports
-    assert loaded.log_file == defaults.log_file
-    assert loaded.log_max_bytes == defaults.log_max_bytes
-    assert loaded.log_backup_count == defaults.log_backup_count
-    assert loaded.backup_retention_days == defaults.backup_retention_days
+    assert load_config(path=tmp_path / "settings.toml") == AppConfig()
 
 
 def test_save_and_load_roundtrip(tmp_path: Path) -> None:
@@ -46,67 +39,66 @@ def test_save_and_load_roundtrip(tmp_path: Path) -> None:
     assert loaded == original
 
 
-def test_load_config_invalid_values_fallback(tmp_path: Path) -> None:
-    config_path = tmp_path / "settings.toml"
-    config_path.write_text(
-        "\n".join(
-            [
-                "[patch_gui]",
-                "threshold = 5",
-                'exclude_dirs = ""',
-                'backup_base = "   "',
-                "log_level = 123",
-                'dry_run_default = "maybe"',
-                'write_reports = "sometimes"',
-                'log_file = "   "',
-                "log_max_bytes = -1",
-                "log_backup_count = -5",
-                "backup_retention_days = -10",
-                "",
-            ]
-        ),
-        encoding="utf-8",
-    )
-
-    loaded = load_config(path=config_path)
-    defaults = AppConfig()
-
-    assert loaded.threshold == defaults.threshold
-    assert loaded.exclude_dirs == defaults.exclude_dirs
-    assert loaded.backup_base == defaults.backup_base
-    assert loaded.log_level == defaults.log_level
-    assert loaded.dry_run_default == defaults.dry_run_default
-    assert loaded.write_reports == defaults.write_reports
-    assert loaded.log_file == defaults.log_file
-    assert loaded.log_max_bytes == defaults.log_max_bytes
-    assert loaded.log_backup_count == defaults.log_backup_count
-    assert loaded.backup_retention_days == defaults.backup_retention_days
-
-
-def test_load_config_accepts_empty_exclude_list(tmp_path: Path) -> None:
-    config_path = tmp_path / "settings.toml"
-    config_path.write_text(
-        "\n".join(
-            [
-                "[patch_gui]",
-                "threshold = 0.85",
-                "exclude_dirs = []",
-                'backup_base = "' + str(tmp_path / "backups") + '"',
-                'log_level = "warning"',
-                "dry_run_default = false",
-                "write_reports = true",
-                'log_file = "' + str(tmp_path / "log.txt") + '"',
-                "log_max_bytes = 1024",
-                "log_backup_count = 4",
-                "backup_retention_days = 30",
-                "",
-            ]
-        ),
-        encoding="utf-8",
+_INVALID_CONFIG_TOML = """\
+[patch_gui]
+threshold = 5
+exclude_dirs = ""
+backup_base = "   "
+log_level = 123
+dry_run_default = "maybe"
+write_reports = "sometimes"
+log_file = "   "
+log_max_bytes = -1
+log_backup_count = -5
+backup_retention_days = -10
+"""
+
+_EMPTY_EXCLUDE_TOML = """\
+[patch_gui]
+threshold = 0.85
+exclude_dirs = []
+backup_base = "{backup_base}"
+log_level = "warning"
+dry_run_default = false
+write_reports = true
+log_file = "{log_file}"
+log_max_bytes = 1024
+log_backup_count = 4
+backup_retention_days = 30
+"""
+
+
+@typed_fixture(params=["tomllib", "line-based"])
+def parse_settings(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> Callable[[str], AppConfig]:
+    """Parse settings text in memory with ``tomllib`` or the 3.10 fallback."""
+
+    if request.param == "line-based":
+        monkeypatch.setattr(config_module, "_import_tomllib", lambda: None)
+
+    def parse(text: str) -> AppConfig:
+        parsed = config_module._load_toml(text.encode("utf-8"))
+        return AppConfig.from_mapping(parsed["patch_gui"])
+
+    return parse
+
+
+def test_from_mapping_invalid_values_fallback(
+    parse_settings: Callable[[str], AppConfig],
+) -> None:
+    assert parse_settings(_INVALID_CONFIG_TOML) == AppConfig()
+
+
+def test_from_mapping_accepts_empty_exclude_list(
+    parse_settings: Callable[[str], AppConfig], tmp_path: Path
+) -> None:
+    loaded = parse_settings(
+        _EMPTY_EXCLUDE_TOML.format(
+            backup_base=tmp_path / "backups", log_file=tmp_path / "log.txt"
+        )
     )
 
-    loaded = load_config(path=config_path)
-
     assert loaded.exclude_dirs == tuple()
     assert loaded.threshold == pytest.approx(0.85)
     assert loaded.log_level == "warning"
@@ -117,3 +109,107 @@ def test_load_config_accepts_empty_exclude_list(tmp_path: Path) -> None:
     assert loaded.log_max_bytes == 1024
     assert loaded.log_backup_count == 4
     assert loaded.backup_retention_days == 30
+
+
+def test_load_config_returns_independent_instances(tmp_path: Path) -> None:
+    config_path = save_config(AppConfig(threshold=0.9), path=tmp_path / "settings.toml")
+
+    first = load_config(path=config_path)
+    first.threshold = 0.5
+
+    assert load_config(path=config_path).threshold == pytest.approx(0.9)
+
+
+def test_save_config_refreshes_cached_load(tmp_path: Path) -> None:
+    config_path = tmp_path / "settings.toml"
+    save_config(AppConfig(threshold=0.9), path=config_path)
+    assert load_config(path=config_path).threshold == pytest.approx(0.9)
+
+    save_config(AppConfig(threshold=0.8), path=config_path)
+
+    assert load_config(path=config_path).threshold == pytest.approx(0.8)
+
+
+def test_load_config_notices_replaced_file_with_same_size_and_mtime(
+    tmp_path: Path,
+) -> None:
+    config_path = tmp_path / "settings.toml"
+    config_path.write_text("[patch_gui]\nthreshold = 0.9\n", encoding="utf-8")
+    assert load_config(path=config_path).threshold == pytest.approx(0.9)
+    original = config_path.stat()
+
+    replacement = tmp_path / "replacement.toml"
+    replacement.write_text("[patch_gui]\nthreshold = 0.8\n", encoding="utf-8")
+    os.utime(replacement, ns=(original.st_atime_ns, original.st_mtime_ns))
+    os.replace(replacement, config_path)
+
+    assert load_config(path=config_path).threshold == pytest.approx(0.8)
+
+
+def test_load_config_resolves_defaults_on_every_call(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config_path = tmp_path / "settings.toml"
+    config_path.write_text("[patch_gui]\nthreshold = 0.9\n", encoding="utf-8")
+    monkeypatch.setenv("HOME", str(tmp_path / "first"))
+    assert load_config(path=config_path).backup_base.parent == tmp_path / "first"
+
+    monkeypatch.setenv("HOME", str(tmp_path / "second"))
+
+    assert load_config(path=config_path).backup_base.parent == tmp_path / "second"
+
+
+def test_save_config_creates_file_with_umask_mode(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def forbidden_umask(mask: int) -> int:
+        raise AssertionError("save_config must not change the process umask")
+
+    previous_umask = os.umask(0o022)
+    try:
+        with monkeypatch.context() as patch:
+            patch.setattr(os, "umask", forbidden_umask)
+            config_path = save_config(AppConfig(), path=tmp_path / "settings.toml")
+    finally:
+        os.umask(previous_umask)
+
+    assert stat.S_IMODE(config_path.stat().st_mode) == 0o644
+
+
+def test_save_config_keeps_existing_file_mode(tmp_path: Path) -> None:
+    config_path = save_config(AppConfig(), path=tmp_path / "settings.toml")
+    config_path.chmod(0o640)
+
+    save_config(AppConfig(threshold=0.5), path=config_path)
+
+    assert stat.S_IMODE(config_path.stat().st_mode) == 0o640
+
+
+def test_save_config_writes_through_symlink(tmp_path: Path) -> None:
+    real_path = save_config(AppConfig(), path=tmp_path / "dotfiles" / "settings.toml")
+    link_path = tmp_path / "settings.toml"
+    link_path.symlink_to(real_path)
+
+    save_config(AppConfig(threshold=0.5), path=link_path)
+
+    assert link_path.is_symlink()
+    assert load_config(path=real_path).threshold == pytest.approx(0.5)
+
+
+def test_save_config_keeps_previous_file_when_replace_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config_path = save_config(AppConfig(threshold=0.9), path=tmp_path / "settings.toml")
+    previous = config_path.read_bytes()
+
+    def failing_replace(src: str, dst: Path) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+
+    with pytest.raises(OSError):
+        save_config(AppConfig(threshold=0.5), path=config_path)
+
+    assert config_path.read_bytes() == previous
+    with os.scandir(tmp_path) as entries:
+        assert [entry.name for entry in entries] == [config_path.name]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Callable, Final, cast
 
 import pytest
 
@@ -9,132 +9,90 @@ from patch_gui import diff_applier_gui
 from patch_gui.config import AppConfig
 from tests._pytest_typing import typed_fixture, typed_parametrize
 
-try:  # pragma: no cover - environment-dependent
-    from PySide6 import QtWidgets as _QtWidgets
-except Exception as exc:  # pragma: no cover - optional dependency
-    QtWidgets: Any | None = None
-    _QT_IMPORT_ERROR: Exception | None = exc
-else:  # pragma: no cover - exercised when bindings are available
-    QtWidgets = _QtWidgets
-    _QT_IMPORT_ERROR = None
-
 
 GUI_RESULT = 42
 CLI_RESULT = 17
 CONFIG_RESULT = 7
 
 
-@typed_fixture()
-def qt_app() -> Any:
-    if QtWidgets is None:
-        pytest.skip(f"PySide6 non disponibile: {_QT_IMPORT_ERROR}")
-    assert QtWidgets is not None
-    qt_widgets = QtWidgets
-    app = qt_widgets.QApplication.instance()
-    if app is None:
-        app = qt_widgets.QApplication([])
-    return app
+_DispatchCase = tuple[list[str], list[tuple[str, object]], int]
 
+_ROOT_TAIL: Final[tuple[str, ...]] = ("--root", ".", "patch.diff")
 
-@typed_parametrize(
-    "argv, expected_calls, expected_result",
-    [
-        ([], [("gui", ())], GUI_RESULT),
-        (["apply", "patch.diff"], [("cli", ["patch.diff"])], CLI_RESULT),
-        (["config", "show"], [("config", ["show"])], CONFIG_RESULT),
-        (
-            ["--root", ".", "patch.diff"],
-            [("cli", ["--root", ".", "patch.diff"])],
-            CLI_RESULT,
-        ),
-        (
-            ["--non-interactive", "--root", ".", "patch.diff"],
-            [("cli", ["--non-interactive", "--root", ".", "patch.diff"])],
-            CLI_RESULT,
-        ),
-        (
-            ["--no-report", "--root", ".", "patch.diff"],
-            [("cli", ["--no-report", "--root", ".", "patch.diff"])],
-            CLI_RESULT,
-        ),
-        (
-            ["--report-json", "report.json", "--root", ".", "patch.diff"],
-            [
-                (
-                    "cli",
-                    ["--report-json", "report.json", "--root", ".", "patch.diff"],
-                )
-            ],
-            CLI_RESULT,
-        ),
-        (
-            ["--report-txt=report.txt", "--root", ".", "patch.diff"],
-            [
-                (
-                    "cli",
-                    ["--report-txt=report.txt", "--root", ".", "patch.diff"],
-                )
-            ],
-            CLI_RESULT,
-        ),
-        (
-            ["--encoding=utf-8", "--root", ".", "patch.diff"],
-            [
-                ("cli", ["--encoding=utf-8", "--root", ".", "patch.diff"]),
-            ],
-            CLI_RESULT,
-        ),
-        (
-            ["--log-level", "debug", "--root", ".", "patch.diff"],
-            [
-                ("cli", ["--log-level", "debug", "--root", ".", "patch.diff"]),
-            ],
-            CLI_RESULT,
-        ),
-        (
-            ["--exclude-dir=build", "--root", ".", "patch.diff"],
-            [
-                ("cli", ["--exclude-dir=build", "--root", ".", "patch.diff"]),
-            ],
-            CLI_RESULT,
-        ),
-    ],
+
+def _cli_case(*prefix: str) -> _DispatchCase:
+    argv = [*prefix, *_ROOT_TAIL]
+    return argv, [("cli", list(argv))], CLI_RESULT
+
+
+_DISPATCH_CASES: Final[tuple[_DispatchCase, ...]] = (
+    ([], [("gui", ())], GUI_RESULT),
+    (["apply", "patch.diff"], [("cli", ["patch.diff"])], CLI_RESULT),
+    (["config", "show"], [("config", ["show"])], CONFIG_RESULT),
+    _cli_case(),
+    _cli_case("--non-interactive"),
+    _cli_case("--no-report"),
+    _cli_case("--report-json", "report.json"),
+    _cli_case("--report-txt=report.txt"),
+    _cli_case("--encoding=utf-8"),
+    _cli_case("--log-level", "debug"),
+    _cli_case("--exclude-dir=build"),
 )
-def test_main_dispatches_between_gui_and_cli(
-    argv: list[str],
-    expected_calls: list[tuple[str, object]],
-    expected_result: int,
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
-    calls: list[tuple[str, object]] = []
 
-    def fake_run_cli(args: list[str]) -> int:
-        calls.append(("cli", args))
+
+def _case_id(argv: list[str]) -> str:
+    if not argv:
+        return "gui"
+    return argv[0].lstrip("-").split("=", 1)[0]
+
+
+class _DispatchRecorder:
+    """Stand-in for the CLI, config and GUI entry points used by ``main``."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, object]] = []
+
+    def run_cli(self, args: list[str]) -> int:
+        self.calls.append(("cli", args))
         return CLI_RESULT
 
-    def fake_run_config(args: list[str]) -> int:
-        calls.append(("config", args))
+    def run_config(self, args: list[str]) -> int:
+        self.calls.append(("config", args))
         return CONFIG_RESULT
 
-    def fake_launch_gui() -> int:
-        calls.append(("gui", ()))
+    def launch_gui(self) -> int:
+        self.calls.append(("gui", ()))
         return GUI_RESULT
 
-    module_cli = cast(Any, diff_applier_gui).cli
-    monkeypatch.setattr(module_cli, "run_cli", fake_run_cli)
-    monkeypatch.setattr(module_cli, "run_config", fake_run_config)
-    monkeypatch.setattr(diff_applier_gui, "_launch_gui", fake_launch_gui)
 
-    result = diff_applier_gui.main(argv)
+@typed_fixture()
+def dispatch_recorder(monkeypatch: pytest.MonkeyPatch) -> _DispatchRecorder:
+    recorder = _DispatchRecorder()
+    module_cli = cast(Any, diff_applier_gui).cli
+    monkeypatch.setattr(module_cli, "run_cli", recorder.run_cli)
+    monkeypatch.setattr(module_cli, "run_config", recorder.run_config)
+    monkeypatch.setattr(diff_applier_gui, "_launch_gui", recorder.launch_gui)
+    return recorder
 
-    assert result == expected_result
-    assert calls == expected_calls
 
+@typed_parametrize(
+    "argv, expected_calls, expected_result",
+    _DISPATCH_CASES,
+    ids=[_case_id(argv) for argv, _, _ in _DISPATCH_CASES],
+)
+def test_main_dispatches_between_gui_and_cli(
+    argv: list[str],
+    expected_calls: list[tuple[str, object]],
+    expected_result: int,
+    dispatch_recorder: _DispatchRecorder,
+) -> None:
+    assert diff_applier_gui.main(argv) == expected_result
+    assert dispatch_recorder.calls == expected_calls
 
-def test_settings_dialog_gathers_config(qt_app: Any, tmp_path: Path) -> None:
-    if QtWidgets is None:
-        pytest.skip(f"PySide6 non disponibile: {_QT_IMPORT_ERROR}")
 
+def test_settings_dialog_gathers_config(
+    make_widget: Callable[..., Any], tmp_path: Path
+) -> None:
     from patch_gui import app as app_module
 
     base = tmp_path / "backups"
@@ -151,7 +109,7 @@ def test_settings_dialog_gathers_config(qt_app: Any, tmp_path: Path) -> None:
         backup_retention_days=4,
     )
 
-    dialog = app_module.SettingsDialog(None, config=config)
+    dialog = make_widget(app_module.SettingsDialog, None, config=config)
     dialog.threshold_spin.setValue(0.91)
     dialog.exclude_edit.setText("one, two, two , three")
     new_backup = tmp_path / "custom"
@@ -182,12 +140,11 @@ def test_settings_dialog_gathers_config(qt_app: Any, tmp_path: Path) -> None:
 
 
 def test_main_window_applies_settings_dialog(
-    qt_app: Any,
+    make_widget: Callable[..., Any],
     monkeypatch: pytest.MonkeyPatch,
     tmp_path: Path,
 ) -> None:
-    if QtWidgets is None:
-        pytest.skip(f"PySide6 non disponibile: {_QT_IMPORT_ERROR}")
+    from PySide6 import QtWidgets
 
     from patch_gui import app as app_module
 
@@ -230,7 +187,7 @@ def test_main_window_applies_settings_dialog(
         log_backup_count=0,
     )
 
-    window = app_module.MainWindow(app_config=original)
+    window = make_widget(app_module.MainWindow, app_config=original)
 
     new_config = AppConfig(
         threshold=0.93,
@@ -249,7 +206,6 @@ def test_main_window_applies_settings_dialog(
             self.result_config = result
 
         def exec(self) -> Any:
-            assert QtWidgets is not None
             return QtWidgets.QDialog.DialogCode.Accepted
 
     fake_dialog = _FakeDialog(new_config)
@@ -270,5 +226,3 @@ def test_main_window_applies_settings_dialog(
         }
     ]
     assert saved_configs[-1] == new_config
-
-    window.close()
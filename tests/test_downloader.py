@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 
-import io
 import json
+from collections import deque
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Deque
 
 import pytest
 
@@ -14,37 +14,40 @@ from patch_gui import downloader
 
 class _FakeResponse:
     def __init__(self, payload: bytes) -> None:
-        self._buffer = io.BytesIO(payload)
+        self._view = memoryview(payload)
+        self._pos = 0
 
     def read(self, size: int = -1) -> bytes:
-        return self._buffer.read(size)
+        end = len(self._view) if size < 0 else min(self._pos + size, len(self._view))
+        chunk = bytes(self._view[self._pos : end])
+        self._pos = end
+        return chunk
 
-    def close(self) -> None:  # pragma: no cover - ``BytesIO`` does not require closing
-        self._buffer.close()
+    def close(self) -> None:
+        self._view.release()
 
 
 class _FakeOpener:
     def __init__(self, responses: list[_FakeResponse]) -> None:
-        self._responses: List[_FakeResponse] = list(responses)
+        self._responses: Deque[_FakeResponse] = deque(responses)
         self.requests: list[str] = []
 
     def __call__(self, request: Any) -> _FakeResponse:
         self.requests.append(request.full_url)
         if not self._responses:
             raise AssertionError("No fake responses left for opener")
-        return self._responses.pop(0)
+        return self._responses.popleft()
+
+
+_RELEASE_PAYLOAD_TEMPLATE = b'{"assets": [{"name": %b, "browser_download_url": %b}]}'
+_ASSET_NAME_JSON = json.dumps(downloader.DEFAULT_ASSET_NAME).encode("utf-8")
 
 
 def _release_payload(url: str) -> bytes:
-    body = {
-        "assets": [
-            {
-                "name": downloader.DEFAULT_ASSET_NAME,
-                "browser_download_url": url,
-            }
-        ]
-    }
-    return json.dumps(body).encode("utf-8")
+    return _RELEASE_PAYLOAD_TEMPLATE % (
+        _ASSET_NAME_JSON,
+        json.dumps(url).encode("utf-8"),
+    )
 
 
 def test_download_latest_release_exe_saves_file(tmp_path: Path) -> None:
@@ -8,6 +8,7 @@ from unidiff.patch import Hunk
 from unidiff.patch import PatchedFile
 
 from patch_gui.filetypes import FileTypeInfo, inspect_file_type
+from tests._pytest_typing import typed_parametrize
 
 
 def _first_file(diff: str) -> PatchedFile:
@@ -15,27 +16,22 @@ def _first_file(diff: str) -> PatchedFile:
     return patch[0]
 
 
-def test_inspect_python_file() -> None:
-    diff = (
-        """--- a/app.py\n+++ b/app.py\n@@ -1 +1 @@\n-print('hi')\n+print('hello')\n"""
-    )
+@typed_parametrize(
+    "filename, old, new, expected",
+    [
+        ("app.py", "print('hi')", "print('hello')", "python"),
+        ("config.json", '{"a": 1}', '{"a": 2}', "json"),
+        ("Makefile", "old:", "new:", "makefile"),
+        ("notes", "old", "new", "text"),
+    ],
+    ids=["python", "json", "special-filename", "unknown-defaults-to-text"],
+)
+def test_inspect_file_type_by_name(
+    filename: str, old: str, new: str, expected: str
+) -> None:
+    diff = f"--- a/{filename}\n+++ b/{filename}\n@@ -1 +1 @@\n-{old}\n+{new}\n"
     info = inspect_file_type(_first_file(diff))
-    assert info == FileTypeInfo(name="python")
-
-
-def test_inspect_json_file() -> None:
-    diff = (
-        """--- a/config.json\n+++ b/config.json\n@@ -1 +1 @@\n-{"a": 1}\n+{"a": 2}\n"""
-    )
-    info = inspect_file_type(_first_file(diff))
-    assert info.name == "json"
-    assert info.preserve_final_newline is True
-
-
-def test_inspect_special_filename() -> None:
-    diff = """--- a/Makefile\n+++ b/Makefile\n@@ -1 +1 @@\n-old:\n+new:\n"""
-    info = inspect_file_type(_first_file(diff))
-    assert info.name == "makefile"
+    assert info == FileTypeInfo(name=expected)
 
 
 def test_inspect_binary_stub() -> None:
@@ -51,9 +47,3 @@ def test_inspect_binary_stub() -> None:
     info = inspect_file_type(DummyBinary())
     assert info.name == "binary"
     assert info.preserve_trailing_whitespace is False
-
-
-def test_inspect_unknown_defaults_to_text() -> None:
-    diff = """--- a/notes\n+++ b/notes\n@@ -1 +1 @@\n-old\n+new\n"""
-    info = inspect_file_type(_first_file(diff))
-    assert info.name == "text"
@@ -5,20 +5,10 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-import pytest
 from unidiff import PatchSet
 
 from patch_gui.patcher import ApplySession, prepare_backup_dir
 
-try:  # pragma: no cover - optional dependency
-    from PySide6 import QtWidgets as _QtWidgets
-except Exception as exc:  # pragma: no cover - PySide6 missing in environment
-    QtWidgets: Any | None = None
-    _QT_IMPORT_ERROR: Exception | None = exc
-else:  # pragma: no cover - executed when bindings are available
-    QtWidgets = _QtWidgets
-    _QT_IMPORT_ERROR = None
-
 
 ADDED_DIFF = """--- /dev/null
 +++ b/new_dir/example.txt
@@ -43,20 +33,6 @@ OUTSIDE_DIFF = """--- /dev/null
 """
 
 
-@pytest.fixture()  # type: ignore[misc]
-def qt_app() -> Any:
-    """Provide a ``QApplication`` instance for tests that need Qt."""
-
-    if QtWidgets is None:  # pragma: no cover - PySide6 missing
-        pytest.skip(f"PySide6 non disponibile: {_QT_IMPORT_ERROR}")
-
-    assert QtWidgets is not None
-    app = QtWidgets.QApplication.instance()
-    if app is None:
-        app = QtWidgets.QApplication([])
-    return app
-
-
 def _build_session(project_root: Path, *, dry_run: bool) -> ApplySession:
     backup_base = project_root.parent / "backups"
     backup_dir = prepare_backup_dir(
@@ -8,7 +8,7 @@ from typing import Any, Iterator, cast
 import pytest
 
 from patch_gui import i18n
-from tests._pytest_typing import typed_fixture
+from tests._pytest_typing import typed_fixture, typed_parametrize
 
 MODULE_I18N = cast(Any, i18n)
 
@@ -43,14 +43,19 @@ def dummy_qtcore(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
     yield None
 
 
-def test_candidate_codes_orders_locale_language_and_english(dummy_qtcore: None) -> None:
-    locale = DummyLocale("pt-BR", "Portuguese")
-    assert i18n._candidate_codes(cast(Any, locale)) == ["pt_br", "pt", "en"]
-
-
-def test_candidate_codes_handles_missing_specific_code(dummy_qtcore: None) -> None:
-    locale = DummyLocale("", "Italian")
-    assert i18n._candidate_codes(cast(Any, locale)) == ["it", "en"]
+@typed_parametrize(
+    "name, language, expected",
+    [
+        ("pt-BR", "Portuguese", ["pt_br", "pt", "en"]),
+        ("", "Italian", ["it", "en"]),
+    ],
+    ids=["specific-code", "language-only"],
+)
+def test_candidate_codes_orders_locale_language_and_english(
+    name: str, language: str, expected: list[str], dummy_qtcore: None
+) -> None:
+    locale = DummyLocale(name, language)
+    assert i18n._candidate_codes(cast(Any, locale)) == expected
 
 
 def test_ensure_compiled_prefers_up_to_date_packaged(
@@ -75,9 +80,10 @@ def test_ensure_compiled_prefers_up_to_date_packaged(
     assert called is False
 
 
-def test_ensure_compiled_recompiles_outdated_packaged(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
-) -> None:
+@typed_fixture()
+def outdated_translation(tmp_path: Path) -> Path:
+    """Return a ``.ts`` source whose packaged ``.qm`` is older than it."""
+
     packaged = tmp_path / "patch_gui_it.qm"
     packaged.write_text("old")
     ts_path = tmp_path / "patch_gui_it.ts"
@@ -85,45 +91,23 @@ def test_ensure_compiled_recompiles_outdated_packaged(
 
     older = max(0, ts_path.stat().st_mtime - 100)
     os.utime(packaged, (older, older))
-
-    compiled_dir = tmp_path / "cache"
-
-    def fake_which(command: str) -> str | None:
-        return f"/usr/bin/{command}" if command == "pyside6-lrelease" else None
-
-    def fake_run(
-        cmd: list[str],
-        check: bool,
-        stdout: Any,
-        stderr: Any,
-        text: bool,
-    ) -> SimpleNamespace:
-        qm_output = Path(cmd[-1])
-        qm_output.write_text("compiled")
-        return SimpleNamespace(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr(MODULE_I18N.shutil, "which", fake_which)
-    monkeypatch.setattr(MODULE_I18N.subprocess, "run", fake_run)
-
-    result = i18n._ensure_compiled(ts_path, compiled_dir)
-    expected = compiled_dir / f"{ts_path.stem}.qm"
-
-    assert result == expected
-    assert expected.exists()
-
-
-def test_ensure_compiled_falls_back_when_compilation_fails(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    return ts_path
+
+
+@typed_parametrize(
+    "returncode, expected_relative",
+    [(0, "cache/patch_gui_it.qm"), (1, "patch_gui_it.qm")],
+    ids=["lrelease-succeeds", "lrelease-fails"],
+)
+def test_ensure_compiled_handles_outdated_packaged(
+    returncode: int,
+    expected_relative: str,
+    outdated_translation: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
 ) -> None:
-    packaged = tmp_path / "patch_gui_fr.qm"
-    packaged.write_text("old")
-    ts_path = tmp_path / "patch_gui_fr.ts"
-    ts_path.write_text("new")
-
-    older = max(0, ts_path.stat().st_mtime - 100)
-    os.utime(packaged, (older, older))
-
-    compiled_dir = tmp_path / "compiled"
+    ts_path = outdated_translation
+    compiled_dir = tmp_path / "cache"
 
     def fake_which(command: str) -> str | None:
         return f"/usr/bin/{command}" if command == "pyside6-lrelease" else None
@@ -135,14 +119,18 @@ def test_ensure_compiled_falls_back_when_compilation_fails(
         stderr: Any,
         text: bool,
     ) -> SimpleNamespace:
-        return SimpleNamespace(returncode=1, stdout="", stderr="error")
+        if returncode == 0:
+            Path(cmd[-1]).write_text("compiled")
+            return SimpleNamespace(returncode=0, stdout="", stderr="")
+        return SimpleNamespace(returncode=returncode, stdout="", stderr="error")
 
     monkeypatch.setattr(MODULE_I18N.shutil, "which", fake_which)
     monkeypatch.setattr(MODULE_I18N.subprocess, "run", fake_run)
 
     result = i18n._ensure_compiled(ts_path, compiled_dir)
 
-    assert result == packaged
+    assert result == tmp_path / expected_relative
+    assert result.exists()
 
 
 def test_find_lrelease_returns_first_available(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -2,42 +2,62 @@
 
 from __future__ import annotations
 
+import pytest
 from unidiff import PatchSet
+from unidiff.patch import PatchedFile
 
 from patch_gui.diff_formatting import (
     format_diff_side_by_side,
     format_diff_with_line_numbers,
 )
+from tests._pytest_typing import typed_fixture, typed_parametrize
+
+TEXT_DIFF = """diff --git a/foo.txt b/foo.txt\nindex 1234567..89abcde 100644\n--- a/foo.txt\n+++ b/foo.txt\n@@ -1,2 +1,3 @@\n line1\n-line2\n+line2 changed\n+line3\n"""
+
+BINARY_DIFF = """diff --git a/image.png b/image.png\nindex 1234567..89abcde 100644\nBinary files a/image.png and b/image.png differ\n"""
+
+EXPECTED_NUMBERED_TEXT_DIFF = (
+    "\n".join(
+        [
+            "diff --git a/foo.txt b/foo.txt",
+            "index 1234567..89abcde 100644",
+            "--- a/foo.txt",
+            "+++ b/foo.txt",
+            "@@ -1,2 +1,3 @@",
+            "     1 │      1 │  line1",
+            "     2 │        │ -line2",
+            "       │      2 │ +line2 changed",
+            "       │      3 │ +line3",
+        ]
+    )
+    + "\n"
+)
 
 
-def test_format_diff_with_line_numbers_includes_real_positions() -> None:
-    diff_text = """diff --git a/foo.txt b/foo.txt\nindex 1234567..89abcde 100644\n--- a/foo.txt\n+++ b/foo.txt\n@@ -1,2 +1,3 @@\n line1\n-line2\n+line2 changed\n+line3\n"""
+@typed_fixture(scope="module")
+def text_patch() -> tuple[PatchedFile, str]:
+    return PatchSet(TEXT_DIFF)[0], TEXT_DIFF
 
-    patch = PatchSet(diff_text)
-    patched_file = patch[0]
 
-    formatted = format_diff_with_line_numbers(patched_file, diff_text)
+@typed_fixture(scope="module")
+def binary_patch() -> tuple[PatchedFile, str]:
+    return PatchSet(BINARY_DIFF)[0], BINARY_DIFF
 
-    expected_lines = [
-        "diff --git a/foo.txt b/foo.txt",
-        "index 1234567..89abcde 100644",
-        "--- a/foo.txt",
-        "+++ b/foo.txt",
-        "@@ -1,2 +1,3 @@",
-        "     1 │      1 │  line1",
-        "     2 │        │ -line2",
-        "       │      2 │ +line2 changed",
-        "       │      3 │ +line3",
-    ]
 
-    assert formatted == "\n".join(expected_lines) + "\n"
+def test_format_diff_with_line_numbers_includes_real_positions(
+    text_patch: tuple[PatchedFile, str],
+) -> None:
+    patched_file, diff_text = text_patch
 
+    formatted = format_diff_with_line_numbers(patched_file, diff_text)
+
+    assert formatted == EXPECTED_NUMBERED_TEXT_DIFF
 
-def test_format_diff_with_line_numbers_returns_fallback_for_binary() -> None:
-    diff_text = """diff --git a/image.png b/image.png\nindex 1234567..89abcde 100644\nBinary files a/image.png and b/image.png differ\n"""
 
-    patch = PatchSet(diff_text)
-    patched_file = patch[0]
+def test_format_diff_with_line_numbers_returns_fallback_for_binary(
+    binary_patch: tuple[PatchedFile, str],
+) -> None:
+    patched_file, diff_text = binary_patch
 
     assert patched_file.is_binary_file is True
 
@@ -46,11 +66,10 @@ def test_format_diff_with_line_numbers_returns_fallback_for_binary() -> None:
     assert formatted == diff_text
 
 
-def test_format_diff_side_by_side_produces_two_columns() -> None:
-    diff_text = """diff --git a/foo.txt b/foo.txt\nindex 1234567..89abcde 100644\n--- a/foo.txt\n+++ b/foo.txt\n@@ -1,2 +1,3 @@\n line1\n-line2\n+line2 changed\n+line3\n"""
-
-    patch = PatchSet(diff_text)
-    patched_file = patch[0]
+def test_format_diff_side_by_side_produces_two_columns(
+    text_patch: tuple[PatchedFile, str],
+) -> None:
+    patched_file, diff_text = text_patch
 
     left, right = format_diff_side_by_side(patched_file, diff_text)
 
@@ -76,11 +95,10 @@ def test_format_diff_side_by_side_produces_two_columns() -> None:
     ]
 
 
-def test_format_diff_side_by_side_returns_fallback_for_binary() -> None:
-    diff_text = """diff --git a/image.png b/image.png\nindex 1234567..89abcde 100644\nBinary files a/image.png and b/image.png differ\n"""
-
-    patch = PatchSet(diff_text)
-    patched_file = patch[0]
+def test_format_diff_side_by_side_returns_fallback_for_binary(
+    binary_patch: tuple[PatchedFile, str],
+) -> None:
+    patched_file, diff_text = binary_patch
 
     assert patched_file.is_binary_file is True
 
@@ -88,3 +106,21 @@ def test_format_diff_side_by_side_returns_fallback_for_binary() -> None:
 
     assert left == diff_text
     assert right == diff_text
+
+
+@typed_parametrize(
+    "diff_text, expected",
+    [
+        pytest.param(TEXT_DIFF, (2, 1), id="skips-file-headers"),
+        pytest.param(TEXT_DIFF.replace("\n", "\r\n"), (2, 1), id="crlf"),
+        pytest.param("+added\n-removed\n-again\n", (1, 2), id="change-first"),
+        pytest.param("-removed", (0, 1), id="no-trailing-newline"),
+    ],
+)
+def test_count_changes_counts_added_and_removed_lines(
+    diff_text: str, expected: tuple[int, int]
+) -> None:
+    pytest.importorskip("PySide6.QtWidgets", reason="PySide6 non disponibile")
+    from patch_gui.interactive_diff import _count_changes
+
+    assert _count_changes(diff_text) == expected
@@ -1,18 +1,24 @@
 import gettext
-from typing import Any, cast
+from typing import Any, Iterator, cast
 
 import pytest
 
 from patch_gui import localization
+from tests._pytest_typing import typed_fixture
 
 MODULE_LOCALIZATION = cast(Any, localization)
 
 
+@typed_fixture(autouse=True)
+def _reset_translation_cache() -> Iterator[None]:
+    localization.clear_translation_cache()
+    yield
+    localization.clear_translation_cache()
+
+
 def test_get_translator_uses_english_by_default(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    localization.clear_translation_cache()
-
     captured: dict[str, Any] = {}
 
     def fake_translation(
@@ -37,19 +43,13 @@ def test_get_translator_uses_english_by_default(
     assert languages == ["en"]
     assert translator.gettext("Sample message") == "Sample message"
 
-    localization.clear_translation_cache()
-
 
 def test_ui_messages_default_to_english() -> None:
-    localization.clear_translation_cache()
     translator = localization.get_translator("en")
     samples = [
         "Selezione obbligatoria",
         "Applicazione diff in corso…",
         "Ripristinare i file dalla sessione {name}?\n\nI file correnti saranno sovrascritti.",
     ]
-    try:
-        for message in samples:
-            assert translator.gettext(message) == message
-    finally:
-        localization.clear_translation_cache()
+    for message in samples:
+        assert translator.gettext(message) == message